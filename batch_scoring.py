@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Bulk compatibility scoring through the Message Batches API
+Collects every unscored listing in the jobs table, submits them as one batch
+(chunked at max_batch_requests), polls until the batch has ended and writes
+each Match Score back to jobs.compatability. Batches cost half as much as
+individual calls and aren't subject to the per-minute limits, at the price of
+results arriving within 24 hours instead of seconds. Answers already in the
+score cache are written without being submitted. FakeBatchClient stands in
+for the API offline.
+
+    python batch_scoring.py [craigslist_jobs.db] [--fake] [--top-k N] [--min-relevance X]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from types import SimpleNamespace
+import anthropic
+from job_scoring import fake_match_score, parse_match_score, request_text, response_text, score_model, score_request, score_template_id
+from score_cache import default_cache, score_key
+from job_prefilter import prefiltered, select_for_scoring
+
+max_batch_requests = 10000
+no_description = "No description found"
+
+def unscored_jobs(conn):
+    """(id, description) of every listing with a description but no score.
+    Listings the pre-filter dropped are stored as prefiltered, not NULL, so
+    they aren't included."""
+    return conn.execute(
+        "SELECT id, description FROM jobs WHERE compatability IS NULL AND description IS NOT NULL AND description != ?",
+        (no_description,)).fetchall()
+
+def batch_request(resume, job_id, description):
+    return {'custom_id': f"job-{job_id}", 'params': score_request(resume, description)}
+
+def run_batch(client, requests, poll_interval=30, timeout=None):
+    """Submit one batch and wait for it; returns {custom_id: answer text}
+    for the requests that succeeded"""
+    batch = client.messages.batches.create(requests=requests)
+    print(f"Submitted batch {batch.id} with {len(requests)} requests")
+    started = time.monotonic()
+    while batch.processing_status != "ended":
+        if timeout and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch.id} still {batch.processing_status} after {timeout}s")
+        time.sleep(poll_interval)
+        batch = client.messages.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        print(f"Batch {batch.id}: {counts.processing} processing, {counts.succeeded} succeeded, {counts.errored} errored")
+
+    answers = {}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            answers[entry.custom_id] = response_text(entry.result.message)
+        else:
+            print(f"{entry.custom_id}: {entry.result.type}")
+    return answers
+
+def score_jobs_table_batch(conn, resume, client=None, cache=None, poll_interval=30, timeout=None,
+                           top_k=None, min_relevance=None):
+    """Score every unscored listing in conn's jobs table with batches and
+    write the scores back. Returns the number of rows scored. With top_k or
+    min_relevance only the listings the job_prefilter ranking keeps are
+    scored; the rest are marked prefiltered so later runs skip them."""
+    client = client or anthropic.Anthropic(api_key=os.getenv("CLAUDE_API_KEY"))
+    jobs = unscored_jobs(conn)
+    if top_k is not None or min_relevance is not None:
+        selected, _ = select_for_scoring(resume, [description for _, description in jobs], top_k, min_relevance)
+        print(f"Pre-filter kept {len(selected)} of {len(jobs)} unscored listings")
+        keep = set(selected)
+        conn.executemany("UPDATE jobs SET compatability = ? WHERE id = ?",
+                         [(prefiltered, job_id) for i, (job_id, _) in enumerate(jobs) if i not in keep])
+        conn.commit()
+        jobs = [jobs[i] for i in selected]
+    scored = 0
+
+    pending = []
+    for job_id, description in jobs:
+        answer = cache.get(score_key(score_model, score_template_id, resume, description)) if cache else None
+        if answer is None:
+            pending.append((job_id, description))
+        else:
+            conn.execute("UPDATE jobs SET compatability = ? WHERE id = ?", (parse_match_score(answer) or answer, job_id))
+            scored += 1
+    conn.commit()
+    print(f"{len(jobs)} unscored listings, {scored} from the score cache, {len(pending)} to submit")
+
+    for start in range(0, len(pending), max_batch_requests):
+        chunk = pending[start:start + max_batch_requests]
+        descriptions = {f"job-{job_id}": (job_id, description) for job_id, description in chunk}
+        answers = run_batch(client, [batch_request(resume, job_id, description) for job_id, description in chunk],
+                            poll_interval, timeout)
+        for custom_id, answer in answers.items():
+            job_id, description = descriptions[custom_id]
+            conn.execute("UPDATE jobs SET compatability = ? WHERE id = ?", (parse_match_score(answer) or answer, job_id))
+            if cache:
+                cache.put(score_key(score_model, score_template_id, resume, description), score_model, answer)
+            scored += 1
+        conn.commit()
+    return scored
+
+class FakeBatchClient:
+    """Offline stand-in for the Message Batches endpoints: a batch ends after
+    `polls` retrieves and every request succeeds with a word-overlap score"""
+    def __init__(self, polls=2):
+        self.polls = polls
+        self.batches = {}
+        self.messages = SimpleNamespace(batches=self)
+
+    def _status(self, batch_id):
+        batch = self.batches[batch_id]
+        ended = batch['retrieves'] >= self.polls
+        count = len(batch['requests'])
+        return SimpleNamespace(
+            id=batch_id,
+            processing_status="ended" if ended else "in_progress",
+            request_counts=SimpleNamespace(processing=0 if ended else count, succeeded=count if ended else 0,
+                                           errored=0, canceled=0, expired=0))
+
+    def create(self, requests):
+        batch_id = f"msgbatch_fake_{len(self.batches) + 1}"
+        self.batches[batch_id] = {'requests': requests, 'retrieves': 0}
+        return self._status(batch_id)
+
+    def retrieve(self, batch_id):
+        self.batches[batch_id]['retrieves'] += 1
+        return self._status(batch_id)
+
+    def results(self, batch_id):
+        for request in self.batches[batch_id]['requests']:
+            text = f"<match_score>{fake_match_score(request_text(request['params']))}%</match_score>"
+            message = SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+            yield SimpleNamespace(custom_id=request['custom_id'], result=SimpleNamespace(type="succeeded", message=message))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fake = "--fake" in args
+    top_k = int(args[args.index("--top-k") + 1]) if "--top-k" in args else None
+    min_relevance = float(args[args.index("--min-relevance") + 1]) if "--min-relevance" in args else None
+    paths = [arg for i, arg in enumerate(args)
+             if not arg.startswith("--") and (i == 0 or args[i - 1] not in ("--top-k", "--min-relevance"))]
+    with open("resume.txt", "r", encoding="utf-8") as file:
+        resume = file.read()
+    conn = sqlite3.connect(paths[0] if paths else "craigslist_jobs.db")
+    if fake:
+        count = score_jobs_table_batch(conn, resume, client=FakeBatchClient(), poll_interval=0,
+                                       top_k=top_k, min_relevance=min_relevance)
+    else:
+        count = score_jobs_table_batch(conn, resume, cache=default_cache(), top_k=top_k, min_relevance=min_relevance)
+    print(f"Scored {count} listings")
+    conn.close()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Parser backend benchmark
+Times parse_wiki_html on saved pages with each backend, full tree vs strained,
+and reports peak memory from tracemalloc. tracemalloc only sees Python
+allocations, so the lxml and selectolax numbers leave out their C trees.
+
+    python bench_parsers.py [file.html ...]
+
+Defaults to the saved page.html and seed_page_content.html. Those are
+Craigslist result pages, so the strained parses find no article ids and show
+the best case; pass a saved Wikipedia article for a like-for-like number.
+"""
+
+import sys
+import time
+import tracemalloc
+from html_parsers import BACKENDS, HAS_LXML, HAS_SELECTOLAX, parse_wiki_html
+
+default_files = ["page.html", "seed_page_content.html"]
+
+def available_runs():
+    """(label, backend, strain) for every backend that is installed"""
+    runs = [("html.parser full", "html.parser", False), ("html.parser strained", "html.parser", True)]
+    if HAS_LXML:
+        runs += [("lxml full", "lxml", False), ("lxml strained", "lxml", True)]
+    if HAS_SELECTOLAX:
+        runs.append(("selectolax", "selectolax", False))
+    return runs
+
+def time_parse(text, backend, strain, repeat=20):
+    """Best-of-repeat parse time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_wiki_html(text, backend, strain)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def peak_memory(text, backend, strain):
+    """Peak Python allocation during one parse in KiB"""
+    tracemalloc.start()
+    parse_wiki_html(text, backend, strain)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+def main(files):
+    print(f"Backends: {', '.join(BACKENDS)} (lxml={HAS_LXML}, selectolax={HAS_SELECTOLAX})")
+    for filename in files:
+        with open(filename, encoding="utf-8") as f:
+            text = f.read()
+        print(f"\n{filename} ({len(text) / 1024:.0f} KiB)")
+        print(f"{'run':<22}{'best ms':>10}{'speedup':>10}{'peak KiB':>12}")
+        baseline = None
+        for label, backend, strain in available_runs():
+            ms = time_parse(text, backend, strain)
+            baseline = baseline or ms
+            kib = peak_memory(text, backend, strain)
+            print(f"{label:<22}{ms:>10.2f}{baseline / ms:>9.1f}x{kib:>12.0f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or default_files)
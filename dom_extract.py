@@ -0,0 +1,174 @@
+"""
+Single-roundtrip DOM extraction for Playwright pages
+Runs the per-field selector fallbacks for every card inside the browser in
+one page call, instead of one query_selector/inner_text IPC round trip per
+selector per field per card. Field specs and hit counting come from the
+shared selector registry in indeed_selectors. The _async variants take an
+async_api page and the same arguments.
+
+Cards are identified by Indeed's job key (data-jk, or the jk= of the card's
+link), which stays the same while the tracking params in the href change,
+so cards whose key is in skip_keys are dropped before any field is read.
+"""
+
+from urllib.parse import parse_qs, urlsplit
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from indeed_selectors import registry as default_registry
+
+# Body of a JS function (card) => job key or null
+card_key_js_body = """
+    const keyed = card.hasAttribute('data-jk') ? card : card.querySelector('[data-jk]');
+    if (keyed) return keyed.getAttribute('data-jk');
+    const link = card.querySelector('a[href*="jk="]');
+    const match = link && link.getAttribute('href').match(/[?&]v?jk=([0-9a-f]+)/);
+    return match ? match[1] : null;
+"""
+
+card_key_js = "card => {" + card_key_js_body + "}"
+
+extract_cards_js = """
+(cards, {fields, skip}) => {
+const cardKey = card => {""" + card_key_js_body + """};
+const skipKeys = new Set(skip);
+return cards.map(card => {
+    const jobKey = cardKey(card);
+    if (jobKey && skipKeys.has(jobKey)) return null;
+    const record = {_hits: {}, job_key: jobKey};
+    for (const field of fields) {
+        let value = null;
+        for (const selector of field.selectors) {
+            const el = card.querySelector(selector);
+            if (!el) continue;
+            let candidate = field.attribute ? el.getAttribute(field.attribute) : null;
+            if (!candidate && field.text) candidate = (el.innerText || '').trim();
+            if (candidate && candidate !== 'N/A' && candidate.length >= field.min_length) {
+                value = candidate;
+                record._hits[field.name] = selector;
+                break;
+            }
+        }
+        record[field.name] = value;
+    }
+    return record;
+}).filter(record => record !== null);
+}
+"""
+
+def count_hits(records, registry):
+    for record in records:
+        for name, selector in record.pop('_hits').items():
+            registry.record_hit(name, selector)
+    return records
+
+def extract_cards(page, card_selector, fields, registry=default_registry, skip_keys=()):
+    """Return one {field name: value or None, 'job_key': key or None} dict per
+    element matching card_selector whose job key isn't in skip_keys, in a
+    single page.evaluate round trip"""
+    arg = {'fields': fields, 'skip': list(skip_keys)}
+    return count_hits(page.eval_on_selector_all(card_selector, extract_cards_js, arg), registry)
+
+async def extract_cards_async(page, card_selector, fields, registry=default_registry, skip_keys=()):
+    """Async extract_cards"""
+    arg = {'fields': fields, 'skip': list(skip_keys)}
+    return count_hits(await page.eval_on_selector_all(card_selector, extract_cards_js, arg), registry)
+
+def card_job_key(element):
+    """The job key of one card element handle, or None"""
+    return element.evaluate(card_key_js)
+
+def find_cards(page, registry=default_registry):
+    """Return (card selector, element handles) for the first card selector
+    that matches anything, or (None, [])"""
+    for selector in registry.selectors('cards'):
+        elements = page.query_selector_all(selector)
+        if elements:
+            registry.record_hit('cards', selector)
+            return selector, elements
+    return None, []
+
+async def find_cards_async(page, registry=default_registry):
+    """Async find_cards"""
+    for selector in registry.selectors('cards'):
+        elements = await page.query_selector_all(selector)
+        if elements:
+            registry.record_hit('cards', selector)
+            return selector, elements
+    return None, []
+
+def card_ready_selector(registry=default_registry):
+    """One CSS selector list matching any known job card"""
+    return ", ".join(registry.selectors('cards'))
+
+def wait_for_cards(page, timeout=30000, registry=default_registry):
+    """Wait until any job card is in the DOM. Returns False on timeout
+    (e.g. no results or a block page) so the caller can save a debug page."""
+    try:
+        page.wait_for_selector(card_ready_selector(registry), state="attached", timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+async def wait_for_cards_async(page, timeout=30000, registry=default_registry):
+    """Async wait_for_cards"""
+    try:
+        await page.wait_for_selector(card_ready_selector(registry), state="attached", timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+def extract_field(element, name, registry=default_registry):
+    """Read one field from an element handle using the registry's
+    fallbacks, or None if no selector gives an acceptable value"""
+    spec = registry.specs[name]
+    for selector in registry.selectors(name):
+        elem = element.query_selector(selector)
+        if not elem:
+            continue
+        value = elem.get_attribute(spec['attribute']) if spec['attribute'] else None
+        if not value and spec['text']:
+            value = elem.inner_text().strip()
+        if value and value != "N/A" and len(value) >= spec['min_length']:
+            registry.record_hit(name, selector)
+            return value
+    return None
+
+def job_key_from_url(url):
+    """The jk (or vjk) job key in an Indeed job URL, or None"""
+    if not url:
+        return None
+    query = parse_qs(urlsplit(url).query)
+    keys = query.get('jk') or query.get('vjk')
+    return keys[0] if keys else None
+
+def absolute_indeed_url(href, job_key=None):
+    """Turn an Indeed href into a full URL: the canonical viewjob URL when
+    there is a job key, so one job always gets the same URL"""
+    job_key = job_key or job_key_from_url(href)
+    if job_key:
+        return f"https://www.indeed.com/viewjob?jk={job_key}"
+    if not href:
+        return "N/A"
+    return f"https://www.indeed.com{href}" if href.startswith('/') else href
+
+def seen_job_keys(cur, table="internships"):
+    """Job keys of every job already stored in a table with a job_url column"""
+    keys = set()
+    for (url,) in cur.execute(f"SELECT job_url FROM {table}"):
+        job_key = job_key_from_url(url)
+        if job_key:
+            keys.add(job_key)
+    return keys
+
+def setup_seen_jobs(cur):
+    """Table of every job key extracted, for scrapers that only store some
+    of the jobs they read"""
+    cur.execute("CREATE TABLE IF NOT EXISTS seen_jobs (job_key TEXT PRIMARY KEY)")
+
+def record_seen_jobs(cur, jobs):
+    """Add the job keys of extracted job dicts to seen_jobs"""
+    keys = [job_key_from_url(job['job_url']) for job in jobs]
+    cur.executemany("INSERT OR IGNORE INTO seen_jobs (job_key) VALUES (?)", [(key,) for key in keys if key])
+
+def recorded_job_keys(cur):
+    """Job keys in seen_jobs"""
+    return {job_key for (job_key,) in cur.execute("SELECT job_key FROM seen_jobs")}
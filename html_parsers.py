@@ -0,0 +1,91 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from wiki_frontier import normalize_url
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+BACKENDS = ["html.parser", "lxml", "selectolax"]
+
+# Fastest backend that is installed; lxml is in requirements.txt, selectolax is optional
+DEFAULT_BACKEND = "selectolax" if HAS_SELECTOLAX else "lxml" if HAS_LXML else "html.parser"
+
+# The only parts of an article the crawler reads
+wiki_ids = ["firstHeading", "mw-normal-catlinks", "mw-content-text"]
+wiki_strainer = SoupStrainer(id=wiki_ids)
+
+
+def make_soup(text, backend=None, parse_only=None):
+    """
+    BeautifulSoup with the given tree builder ("html.parser" or "lxml").
+    Pass a SoupStrainer as parse_only to build only the matching subtrees.
+    """
+    backend = backend or ("lxml" if HAS_LXML else "html.parser")
+    return BeautifulSoup(text, features=backend, parse_only=parse_only)
+
+
+def article_urls(hrefs, count=4):
+    """
+    Return the first `count` distinct article urls among hrefs
+    (all of them if count is None)
+    """
+    urls = []
+    seen = set()
+    for href in hrefs:
+        if href.startswith("/wiki/") and not ":" in href:  # Skip special pages like "Category:", "Help:", etc.
+            full_url = normalize_url(href)
+            if full_url not in seen:
+                seen.add(full_url)
+                urls.append(full_url)
+            if count is not None and len(urls) >= count:
+                break
+    return urls
+
+
+def _parse_wiki_soup(text, backend, strain):
+    soup = make_soup(text, backend, wiki_strainer if strain else None)
+    heading = soup.find("h1", id="firstHeading")
+    title = heading.text.strip() if heading else None
+
+    categories = []
+    cat_div = soup.find("div", id="mw-normal-catlinks")
+    if cat_div and cat_div.find("ul"):
+        categories = [li.text.strip() for li in cat_div.find("ul").find_all("li")]
+
+    content_div = soup.find("div", id="mw-content-text")
+    hrefs = [a["href"] for a in content_div.find_all("a", href=True)] if content_div else []
+    return title, categories, article_urls(hrefs, count=None)
+
+
+def _parse_wiki_selectolax(text):
+    tree = HTMLParser(text)
+    heading = tree.css_first("h1#firstHeading")
+    title = heading.text().strip() if heading else None
+    categories = [li.text().strip() for li in tree.css("#mw-normal-catlinks ul li")]
+    hrefs = [a.attributes.get("href") or "" for a in tree.css("#mw-content-text a[href]")]
+    return title, categories, article_urls(hrefs, count=None)
+
+
+def parse_wiki_html(text, backend=None, strain=True):
+    """
+    Return (title, categories, links) for an article page. backend is one of
+    BACKENDS (default: the fastest installed). With the BeautifulSoup
+    backends, strain=True builds only the heading, catlinks and content
+    subtrees instead of the whole document.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == "selectolax":
+        if not HAS_SELECTOLAX:
+            raise ImportError("selectolax is not installed: pip install selectolax")
+        return _parse_wiki_selectolax(text)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return _parse_wiki_soup(text, backend, strain)
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import sqlite3
+import time
+import requests
+
+
+class CachedPage:
+    """
+    The parts of a response the fetchers use: text, headers and where it came from
+    """
+    def __init__(self, url, text, headers, status_code, from_cache):
+        self.url = url
+        self.text = text
+        self.headers = headers
+        self.status_code = status_code
+        self.from_cache = from_cache
+
+    def __repr__(self):
+        source = "cache" if self.from_cache else "network"
+        return f"<CachedPage [{self.status_code}] {self.url} from {source}>"
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache for conditional GETs. Bodies are stored as files under
+    `path` with their ETag/Last-Modified in an SQLite index; later fetches
+    send If-None-Match/If-Modified-Since and reuse the stored body on a 304.
+    Least recently used entries are evicted once the bodies exceed max_bytes.
+    """
+    def __init__(self, path="http_cache", max_bytes=200 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, "index.db"))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                final_url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                size INTEGER,
+                last_access REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _body_path(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def conditional_headers(self, url):
+        """
+        Return the If-None-Match/If-Modified-Since headers for url, if cached
+        """
+        row = self.conn.execute("SELECT etag, last_modified FROM entries WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def lookup(self, url):
+        """
+        Return the cached CachedPage for url, or None
+        """
+        row = self.conn.execute("SELECT final_url, content_type FROM entries WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self._body_path(url), "rb") as f:
+                text = f.read().decode("utf-8")
+        except FileNotFoundError:
+            self._delete(url)
+            return None
+        self.conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+        self.conn.commit()
+        final_url, content_type = row
+        return CachedPage(final_url, text, {"content-type": content_type}, 200, True)
+
+    def store(self, url, text, headers, final_url=None):
+        """
+        Save a 200 response body; responses without an ETag or Last-Modified
+        can't be revalidated and are skipped
+        """
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        body = text.encode("utf-8")
+        with open(self._body_path(url), "wb") as f:
+            f.write(body)
+        old = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+        if old:
+            self.total_bytes -= old[0]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (url, final_url, etag, last_modified, content_type, size, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, final_url or url, etag, last_modified, headers.get("content-type"), len(body), time.time()),
+        )
+        self.total_bytes += len(body)
+        self._evict()
+        self.conn.commit()
+
+    def _delete(self, url):
+        row = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+        if row:
+            self.total_bytes -= row[0]
+        self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+        try:
+            os.remove(self._body_path(url))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute("SELECT url FROM entries ORDER BY last_access LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._delete(row[0])
+
+    def get(self, url, session=requests, **kwargs):
+        """
+        requests-based conditional GET. Returns a CachedPage whose text is the
+        stored body when the server answers 304 Not Modified.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        response = session.get(url, headers=dict(headers, **self.conditional_headers(url)), **kwargs)
+        if response.status_code == 304:
+            cached = self.lookup(url)
+            if cached is not None:
+                return cached
+            # Index and body disagree, fetch unconditionally with the caller's other headers
+            headers = {name: value for name, value in headers.items()
+                       if name.lower() not in ("if-none-match", "if-modified-since")}
+            response = session.get(url, headers=headers, **kwargs)
+        if response.status_code == 200:
+            self.store(url, response.text, response.headers, response.url)
+        return CachedPage(response.url, response.text, response.headers, response.status_code, False)
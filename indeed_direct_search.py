@@ -5,11 +5,12 @@ Uses pre-constructed search URL to bypass form submission
 """
 
 from playwright.sync_api import sync_playwright
+from dom_extract import card_ready_selector, extract_field, find_cards
+from page_setup import enable_fast_mode, goto_ready
+from indeed_selectors import registry
 import csv
 import json
 from datetime import datetime
-import time
-import random
 
 def scrape_with_direct_url():
     """Scrape using direct Indeed search URL"""
@@ -25,57 +26,47 @@ def scrape_with_direct_url():
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
         )
 
+        # Skip images, fonts, media and trackers
+        enable_fast_mode(context)
+
         page = context.new_page()
 
         try:
             print(f"Loading: {search_url}")
-            page.goto(search_url, timeout=60000)
-
-            # Wait and check what we got
+            # Wait for the first job card and check what we got
             try:
-                page.wait_for_load_state('domcontentloaded', timeout=15000)
+                goto_ready(page, search_url, card_ready_selector(), timeout=60000)
             except:
-                print("Timeout waiting for page load, continuing anyway...")
-            time.sleep(3)
+                print("Timeout waiting for job cards, continuing anyway...")
 
             # Save the page for inspection
             with open('direct_search_result.html', 'w', encoding='utf-8') as f:
                 f.write(page.content())
             print("Page saved as direct_search_result.html")
 
-            # Try to find jobs
-            job_selectors = ['.job_seen_beacon', 'div[data-jk]', '.jobsearch-SerpJobCard']
-
-            for selector in job_selectors:
-                jobs = page.query_selector_all(selector)
-                if jobs:
-                    print(f"Found {len(jobs)} jobs with selector: {selector}")
-
-                    for i, job in enumerate(jobs[:5]):  # First 5 for testing
-                        try:
-                            # Extract basic info
-                            title_elem = job.query_selector('h2 a span, .jobTitle')
-                            title = title_elem.inner_text().strip() if title_elem else f"Job {i+1}"
-
-                            company_elem = job.query_selector('[data-testid="company-name"], .companyName')
-                            company = company_elem.inner_text().strip() if company_elem else "Unknown Company"
-
-                            location_elem = job.query_selector('[data-testid="job-location"], .companyLocation')
-                            location = location_elem.inner_text().strip() if location_elem else "Unknown Location"
+            # Try to find jobs with the shared registry's card selectors
+            selector, jobs = find_cards(page)
+            if jobs:
+                print(f"Found {len(jobs)} jobs with selector: {selector}")
 
-                            jobs_data.append({
-                                'title': title,
-                                'company': company,
-                                'location': location,
-                                'scraped_at': datetime.now().isoformat()
-                            })
+                for i, job in enumerate(jobs[:5]):  # First 5 for testing
+                    try:
+                        # Extract basic info
+                        title = extract_field(job, 'title') or f"Job {i+1}"
+                        company = extract_field(job, 'company') or "Unknown Company"
+                        location = extract_field(job, 'location') or "Unknown Location"
 
-                            print(f"{i+1}. {title} at {company}")
+                        jobs_data.append({
+                            'title': title,
+                            'company': company,
+                            'location': location,
+                            'scraped_at': datetime.now().isoformat()
+                        })
 
-                        except Exception as e:
-                            print(f"Error processing job {i+1}: {e}")
+                        print(f"{i+1}. {title} at {company}")
 
-                    break
+                    except Exception as e:
+                        print(f"Error processing job {i+1}: {e}")
 
             if not jobs_data:
                 print("No jobs found. Check direct_search_result.html to see what Indeed returned.")
@@ -85,6 +76,7 @@ def scrape_with_direct_url():
 
         finally:
             browser.close()
+            registry.save_stats()
 
     # Save results if any found
     if jobs_data:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Offline Indeed extraction
+Parses saved Indeed result pages (results_folder/indeed_*.txt, debug dumps,
+page.content() saves) without a browser, using the same card and field
+selector registry as the live scrapers (indeed_selectors.json) and returning
+the same job dicts as extract_job_info.
+
+    python indeed_offline.py [file_or_folder ...]
+"""
+
+import glob
+import os
+import sys
+from html_parsers import make_soup
+from indeed_selectors import registry
+from richmond_internships_final import is_relevant_internship, job_field_names, job_from_record
+
+default_paths = ["results_folder", "Has_Results.html"]
+
+def element_text(elem):
+    """Approximate innerText: the element's text with whitespace collapsed"""
+    return " ".join(elem.get_text(" ").split())
+
+def extract_field(card, name):
+    """Apply one field's registry fallbacks to a card, like dom_extract does in the browser"""
+    spec = registry.specs[name]
+    for selector, compiled in registry.compiled(name):
+        elem = compiled.select_one(card)
+        if elem is None:
+            continue
+        value = elem.get(spec['attribute']) if spec['attribute'] else None
+        if not value and spec['text']:
+            value = element_text(elem)
+        if value and value != "N/A" and len(value) >= spec['min_length']:
+            registry.record_hit(name, selector)
+            return value
+    return None
+
+def find_cards(soup):
+    """Return the cards matched by the first card selector that finds any"""
+    for selector, compiled in registry.compiled('cards'):
+        cards = compiled.select(soup)
+        if cards:
+            registry.record_hit('cards', selector)
+            return cards
+    return []
+
+def extract_jobs_from_html(html):
+    """Return the job dicts for every card in a saved results page"""
+    soup = make_soup(html)
+    jobs = []
+    for card in find_cards(soup):
+        record = {name: extract_field(card, name) for name in job_field_names}
+        jobs.append(job_from_record(record))
+    return jobs
+
+def extract_jobs_from_file(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return extract_jobs_from_html(f.read())
+
+def expand_paths(paths):
+    """Files as given, folders expanded to the saved pages inside them"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, "indeed_*.txt")) + glob.glob(os.path.join(path, "*.html")))
+        else:
+            files.append(path)
+    return files
+
+if __name__ == "__main__":
+    total = 0
+    for path in expand_paths(sys.argv[1:] or default_paths):
+        jobs = extract_jobs_from_file(path)
+        relevant = [job for job in jobs if is_relevant_internship(job)]
+        total += len(jobs)
+        print(f"{path}: {len(jobs)} jobs, {len(relevant)} relevant internships")
+        for job in relevant:
+            print(f"  {job['title']} at {job['company']}")
+    print(f"Total jobs extracted: {total}")
+    registry.save_stats()
@@ -1,14 +1,10 @@
 from playwright.sync_api import sync_playwright
-import sqlite3
-import time
-import random
+from dom_extract import wait_for_cards
+from pacing import paced_goto
 from datetime import datetime
 
 seed_page = "https://www.indeed.com/"
 
-def random_sleep(a, b):
-    time.sleep(random.uniform(a, b))
-    
 def main():
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False)
@@ -16,22 +12,17 @@ def main():
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
         )
         visitPage = context.new_page()
-        visitPage.goto(seed_page)
-
-        random_sleep(1, 2)
-        visitPage.wait_for_selector("#text-input-what")
+        paced_goto(visitPage, seed_page, "#text-input-what")
         visitPage.fill("#text-input-what", "Software Engineer")
 
-        random_sleep(1, 2)
         visitPage.click('button >> text="Search"')
-        random_sleep(17, 20)
+        wait_for_cards(visitPage)
 
         now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         content = visitPage.content()
         with open(f"results_folder/indeed_{now}.txt", "w+") as file:
             file.write(content)
-        
-        time.sleep(5)
+
         browser.close()
 
 main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Indeed search fan-out
+Runs a watchlist of searches (every query x location x job type in
+indeed_watchlist.json, plus any explicit "searches") concurrently over a
+bounded number of browser contexts, and merges the results into one
+de-duplicated store: the internships table keyed on job_url, with
+internship_searches recording which searches found each job.
+
+    python indeed_search.py [watchlist.json] [max_contexts]
+"""
+
+import asyncio
+import itertools
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from playwright.async_api import async_playwright
+from dom_extract import extract_cards_async, find_cards_async, wait_for_cards_async
+from indeed_selectors import registry
+from pacing import RateLimiter
+from page_setup import enable_fast_mode_async, goto_ready_async
+from richmond_internships_final import job_field_names, job_from_record
+from richmond_internships_scraper import build_indeed_search_url, save_to_csv, save_to_json
+
+default_watchlist = "indeed_watchlist.json"
+user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
+
+def job_specs(queries, locations, job_types=(None,)):
+    """Every query x location x job type as a search spec dict"""
+    return [{'query': q, 'location': l, 'job_type': t}
+            for q, l, t in itertools.product(queries, locations, job_types or (None,))]
+
+def load_watchlist(path=default_watchlist):
+    """The search specs in a watchlist file, without duplicates"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    specs = job_specs(data.get('queries', []), data.get('locations', []), data.get('job_types'))
+    for search in data.get('searches', []):
+        specs.append({'query': search['query'], 'location': search['location'], 'job_type': search.get('job_type')})
+    unique = {}
+    for spec in specs:
+        unique.setdefault((spec['query'], spec['location'], spec['job_type']), spec)
+    return list(unique.values())
+
+def spec_label(spec):
+    label = f"{spec['query']} in {spec['location']}"
+    return f"{label} ({spec['job_type']})" if spec['job_type'] else label
+
+class JobStore:
+    """Merged results of many searches, one row per job_url"""
+    def __init__(self, path="richmond_internships.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS internships (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT,
+                company TEXT,
+                location TEXT,
+                salary TEXT,
+                snippet TEXT,
+                posting_date TEXT,
+                job_url TEXT UNIQUE,
+                scraped_at TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS internship_searches (
+                job_url TEXT,
+                query TEXT,
+                location TEXT,
+                job_type TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (job_url, query, location, job_type)
+            )
+        """)
+        # Older tables stored "all types" as NULL, which the primary key
+        # treats as distinct, so every run added another copy of those rows
+        self.conn.execute("UPDATE OR IGNORE internship_searches SET job_type = '' WHERE job_type IS NULL")
+        self.conn.execute("DELETE FROM internship_searches WHERE job_type IS NULL")
+        self.conn.commit()
+        self.jobs = {}
+
+    def add(self, spec, jobs):
+        """Merge one search's jobs; returns how many were new to this run"""
+        new = 0
+        for job in jobs:
+            url = job['job_url']
+            if url == "N/A" or job['title'] == "N/A":
+                continue
+            if url not in self.jobs:
+                self.jobs[url] = dict(job, found_by=[])
+                new += 1
+                # Only columns both scrapers' internships tables have
+                self.conn.execute("""
+                    INSERT OR IGNORE INTO internships
+                    (title, company, location, salary, snippet, job_url, scraped_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (job['title'], job['company'], job['location'], job['salary'],
+                      job['description'], url, job['scraped_at']))
+            self.jobs[url]['found_by'].append(spec_label(spec))
+            self.conn.execute("INSERT OR IGNORE INTO internship_searches VALUES (?, ?, ?, ?)",
+                              (url, spec['query'], spec['location'], spec['job_type'] or ''))
+        self.conn.commit()
+        return new
+
+    def results(self):
+        return [dict(job, found_by="; ".join(job['found_by'])) for job in self.jobs.values()]
+
+    def close(self):
+        self.conn.close()
+
+async def run_search(context, spec, limiter, timeout=30000):
+    """Load one search's first results page and read all its cards"""
+    page = await context.new_page()
+    try:
+        url = build_indeed_search_url(spec['query'], spec['location'], spec['job_type'])
+        await limiter.wait_async(url)
+        await goto_ready_async(page, url, timeout=timeout)
+        if not await wait_for_cards_async(page, timeout):
+            return []
+        card_selector, _ = await find_cards_async(page)
+        records = await extract_cards_async(page, card_selector, registry.fields(job_field_names))
+        return [job_from_record(record) for record in records]
+    finally:
+        await page.close()
+
+async def run_searches(specs, store, max_contexts=4, rate=1.0, time_budget=None, headless=True):
+    """Run every spec with at most max_contexts searches in flight, one per
+    browser context, merging into store as each finishes. Specs still queued
+    when time_budget seconds have passed are skipped; returns those."""
+    deadline = time.monotonic() + time_budget if time_budget else None
+    todo = asyncio.Queue()
+    for spec in specs:
+        todo.put_nowait(spec)
+    skipped = []
+    # One bucket for the whole fan-out: every search goes to the same host
+    limiter = RateLimiter(rate=rate, burst=max_contexts)
+
+    async def worker(context):
+        while not todo.empty():
+            spec = todo.get_nowait()
+            if deadline and time.monotonic() >= deadline:
+                skipped.append(spec)
+                continue
+            try:
+                jobs = await run_search(context, spec, limiter)
+            except Exception as e:
+                print(f"{spec_label(spec)}: failed ({e})")
+                continue
+            new = store.add(spec, jobs)
+            print(f"{spec_label(spec)}: {len(jobs)} jobs, {new} new")
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        contexts = []
+        for _ in range(max(1, min(max_contexts, len(specs)))):
+            context = await browser.new_context(user_agent=user_agent)
+            await enable_fast_mode_async(context)  # Skip images, fonts, media and trackers
+            contexts.append(context)
+        try:
+            await asyncio.gather(*(worker(context) for context in contexts))
+        finally:
+            await browser.close()
+            registry.save_stats()
+    return skipped
+
+def search_watchlist(path=default_watchlist, max_contexts=4, rate=1.0, time_budget=None):
+    """Run a watchlist file and save the merged results"""
+    specs = load_watchlist(path)
+    print(f"Running {len(specs)} searches over {max_contexts} browser contexts...")
+    store = JobStore()
+    started = time.monotonic()
+    try:
+        skipped = asyncio.run(run_searches(specs, store, max_contexts, rate, time_budget))
+    finally:
+        store.close()
+    jobs = store.results()
+    print(f"{len(jobs)} unique jobs from {len(specs) - len(skipped)} searches in {time.monotonic() - started:.1f}s")
+    if skipped:
+        print(f"Out of time, skipped {len(skipped)} searches")
+
+    if jobs:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        save_to_csv(jobs, f"results_folder/indeed_search_{timestamp}.csv")
+        save_to_json(jobs, f"results_folder/indeed_search_{timestamp}.json")
+    return jobs
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else default_watchlist
+    max_contexts = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    search_watchlist(path, max_contexts)
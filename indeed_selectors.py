@@ -0,0 +1,58 @@
+"""
+Shared Indeed selector registry
+Loads the card and field fallback selectors from indeed_selectors.json so
+every Indeed scraper tries the same lists, and keeps per-selector hit counts
+(saved to indeed_selector_stats.json) so the selector that has matched most
+often is tried first on the next card and the next run.
+"""
+
+import json
+import os
+import soupsieve
+
+registry_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indeed_selectors.json")
+stats_file = "indeed_selector_stats.json"
+
+class SelectorRegistry:
+    def __init__(self, path=registry_file, stats_path=stats_file):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        self.stats_path = stats_path
+        self.specs = dict(data['fields'])
+        self.specs['cards'] = {'selectors': data['cards']['selectors'], 'attribute': None, 'text': False, 'min_length': 1}
+        self.hits = {name: {selector: 0 for selector in spec['selectors']} for name, spec in self.specs.items()}
+        self._compiled = {}
+        if stats_path and os.path.exists(stats_path):
+            with open(stats_path, encoding='utf-8') as f:
+                for name, counts in json.load(f).items():
+                    for selector, count in counts.items():
+                        if selector in self.hits.get(name, {}):
+                            self.hits[name][selector] = count
+
+    def selectors(self, name):
+        """Selectors for a field (or 'cards'), most hits first, file order on ties"""
+        declared = self.specs[name]['selectors']
+        return sorted(declared, key=lambda selector: -self.hits[name][selector])
+
+    def spec(self, name):
+        """Field spec with its selectors in hit-rate order, as dom_extract expects"""
+        return dict(self.specs[name], name=name, selectors=self.selectors(name))
+
+    def fields(self, names):
+        return [self.spec(name) for name in names]
+
+    def compiled(self, name):
+        """soupsieve-compiled selectors for BeautifulSoup, in hit-rate order"""
+        if name not in self._compiled:
+            self._compiled[name] = {selector: soupsieve.compile(selector) for selector in self.specs[name]['selectors']}
+        return [(selector, self._compiled[name][selector]) for selector in self.selectors(name)]
+
+    def record_hit(self, name, selector):
+        self.hits[name][selector] += 1
+
+    def save_stats(self):
+        if self.stats_path:
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                json.dump(self.hits, f, indent=2)
+
+registry = SelectorRegistry()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Job records from the data behind the result pages
+Indeed renders its job cards from JSON assigned to
+window.mosaic.providerData["mosaic-provider-jobcards"], and Craigslist puts
+its postings in an ld+json ItemList. Reading those payloads builds the job
+records directly, without querying the cards one DOM node at a time, and
+picks up fields the cards don't show (job key, job types, remote, posting
+time, employment type). ResponseCapture collects them from page.on("response");
+callers fall back to DOM extraction when a page carries no payload.
+
+    python job_payloads.py [file_or_folder ...]
+"""
+
+import html
+import json
+import re
+import sys
+
+indeed_jobcards_provider = "mosaic-provider-jobcards"
+
+# Indeed result fields that aren't on the cards
+indeed_extra_fields = ['job_key', 'job_types', 'remote', 'posted']
+
+payload_resource_types = ("document", "xhr", "fetch")
+
+ld_json_pattern = re.compile(
+    r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S | re.I)
+tag_pattern = re.compile(r'<[^>]+>')
+
+def json_after(text, marker):
+    """Decode the JSON value that follows marker in text, or None"""
+    start = text.find(marker)
+    if start < 0:
+        return None
+    start += len(marker)
+    while start < len(text) and text[start].isspace():
+        start += 1
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start)
+    except ValueError:
+        return None
+    return value
+
+def find_key(data, key):
+    """First value stored under key anywhere in a decoded JSON document"""
+    if isinstance(data, dict):
+        if key in data:
+            return data[key]
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return None
+    for value in values:
+        found = find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+def plain_text(fragment):
+    """Snippet HTML to one line of text"""
+    if not fragment:
+        return None
+    return " ".join(html.unescape(tag_pattern.sub(" ", fragment)).split()) or None
+
+def mosaic_provider_data(text, provider):
+    """The providerData a mosaic page assigns to one provider, or None"""
+    return json_after(text, f'window.mosaic.providerData["{provider}"]=')
+
+def indeed_salary(result):
+    snippet = result.get('salarySnippet') or {}
+    return snippet.get('text') or (result.get('estimatedSalary') or {}).get('formattedRange')
+
+def indeed_record(result):
+    """One mosaic job card result to an extract_cards style record"""
+    job_key = result.get('jobkey')
+    link = result.get('viewJobLink') or result.get('link')
+    if not link and job_key:
+        link = f"/viewjob?jk={job_key}"
+    return {
+        'title': result.get('displayTitle') or result.get('title'),
+        'company': result.get('company') or result.get('truncatedCompany'),
+        'location': result.get('formattedLocation'),
+        'salary': indeed_salary(result),
+        'snippet': plain_text(result.get('snippet')),
+        'posting_date': result.get('formattedRelativeTime'),
+        'job_url': link,
+        'job_key': job_key,
+        'job_types': ", ".join(result.get('jobTypes') or []) or None,
+        'remote': bool(result.get('remoteLocation')),
+        'posted': result.get('pubDate'),
+    }
+
+def indeed_records_from_payload(data):
+    """Records for every job card result in a decoded mosaic payload"""
+    model = find_key(data, 'mosaicProviderJobCardsModel')
+    results = model.get('results') if isinstance(model, dict) else None
+    return [indeed_record(result) for result in results or [] if isinstance(result, dict)]
+
+def indeed_records_from_text(text):
+    """Records from an Indeed results page or a JSON response body"""
+    data = mosaic_provider_data(text, indeed_jobcards_provider)
+    if data is None and text.lstrip().startswith('{'):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return []
+    return indeed_records_from_payload(data) if data is not None else []
+
+def ld_json_blocks(text):
+    """Every ld+json block in a page that decodes"""
+    blocks = []
+    for match in ld_json_pattern.finditer(text):
+        try:
+            blocks.append(json.loads(match.group(1)))
+        except ValueError:
+            continue
+    return blocks
+
+def craigslist_location(posting):
+    location = posting.get('jobLocation') or {}
+    if isinstance(location, list):
+        location = location[0] if location else {}
+    address = location.get('address') or {}
+    parts = [address.get('addressLocality'), address.get('addressRegion')]
+    return ", ".join(part for part in parts if part) or None
+
+def craigslist_record(posting):
+    """One ld+json JobPosting to a record"""
+    employment_type = posting.get('employmentType')
+    if isinstance(employment_type, list):
+        employment_type = ", ".join(employment_type)
+    salary = posting.get('baseSalary') or {}
+    value = salary.get('value') if isinstance(salary, dict) else None
+    return {
+        'title': posting.get('title'),
+        'company': (posting.get('hiringOrganization') or {}).get('name'),
+        'location': craigslist_location(posting),
+        'employment_type': employment_type or None,
+        'salary': json.dumps(value) if isinstance(value, dict) else value,
+        'posted': posting.get('datePosted'),
+    }
+
+def craigslist_records_from_text(text):
+    """Records for the JobPostings in a Craigslist search page's ld+json, in
+    result order. They carry no URL, so callers pair them with the listings."""
+    records = []
+    for block in ld_json_blocks(text):
+        if not isinstance(block, dict) or block.get('@type') != 'ItemList':
+            continue
+        items = sorted(block.get('itemListElement') or [], key=lambda item: int(item.get('position', 0)))
+        for item in items:
+            posting = item.get('item') or {}
+            if posting.get('@type') == 'JobPosting':
+                records.append(craigslist_record(posting))
+    return records
+
+class ResponseCapture:
+    """Keeps the document/XHR responses a page receives so their bodies can be
+    read for job payloads once the page is ready"""
+    def __init__(self, hosts=None):
+        self.hosts = hosts
+        self.responses = []
+
+    def attach(self, page):
+        page.on("response", self.on_response)
+        return self
+
+    def on_response(self, response):
+        if response.request.resource_type not in payload_resource_types:
+            return
+        if self.hosts and not any(host in response.url for host in self.hosts):
+            return
+        self.responses.append(response)
+
+    def texts(self):
+        """Bodies of the captured responses, newest first"""
+        texts = []
+        for response in reversed(self.responses):
+            try:
+                texts.append(response.text())
+            except Exception:
+                continue  # Redirects and evicted bodies have nothing to read
+        return texts
+
+    async def texts_async(self):
+        texts = []
+        for response in reversed(self.responses):
+            try:
+                texts.append(await response.text())
+            except Exception:
+                continue
+        return texts
+
+    def clear(self):
+        self.responses = []
+
+def first_records(texts, parse):
+    """Records from the newest body that has any"""
+    for text in texts:
+        records = parse(text)
+        if records:
+            return records
+    return []
+
+if __name__ == "__main__":
+    # Check the payload readers against the saved pages, next to what the
+    # DOM extraction finds in the same files
+    from html_parsers import make_soup
+    from indeed_offline import expand_paths, extract_jobs_from_html
+    from playwright_practice import cl_result_selector
+
+    paths = expand_paths(sys.argv[1:] or ["results_folder", "page.html", "seed_page_content.html", "Has_Results.html"])
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        if "craigslist" in text[:5000]:
+            records = craigslist_records_from_text(text)
+            dom_count = len(make_soup(text).select(cl_result_selector))
+        else:
+            records = indeed_records_from_text(text)
+            dom_count = len(extract_jobs_from_html(text))
+        source = "payload" if records else "DOM fallback"
+        print(f"{path}: {len(records)} payload records, {dom_count} DOM cards -> {source}")
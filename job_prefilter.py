@@ -0,0 +1,87 @@
+"""
+Local relevance pre-filter
+Ranks job descriptions against the resume with BM25 before any are sent to
+Claude: the listings become rows of one term-frequency matrix, the resume's
+terms are the query, and every listing is scored in a few NumPy operations.
+Only the top_k listings, or those scoring at least min_relevance of the best
+listing, go on to the API, so scoring cost follows the number of plausible
+jobs rather than the number of listings.
+
+    python job_prefilter.py [craigslist_jobs.db] [top_k]
+"""
+
+import re
+import sys
+import numpy as np
+
+# Stored as a listing's compatability when the pre-filter drops it, so later
+# runs (and batch_scoring) don't pick it up as unscored
+prefiltered = "Pre-filtered"
+
+token_pattern = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+stop_words = frozenset("""
+a about above after all also am an and any are as at be been being below but by can could did do does doing
+down during each few for from further had has have having he her here hers him his how i if in into is it its
+just me more most my no nor not now of off on once only or other our ours out over own same she should so some
+such than that the their them then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours job jobs work working position role
+team company please apply experience years year required requirements including
+""".split())
+
+def tokenize(text):
+    """Lowercase terms with stop words removed; keeps c++, c#, node.js and the like"""
+    return [term for term in token_pattern.findall(text.lower()) if term not in stop_words]
+
+def bm25_scores(query, documents, k1=1.5, b=0.75):
+    """BM25 score of every document against the query text, as an array"""
+    docs = [tokenize(document) for document in documents]
+    if not docs:
+        return np.zeros(0)
+    vocabulary = {}
+    for terms in docs:
+        for term in terms:
+            vocabulary.setdefault(term, len(vocabulary))
+
+    # Term frequencies: one row per document, one column per term
+    tf = np.zeros((len(docs), len(vocabulary)))
+    for row, terms in enumerate(docs):
+        np.add.at(tf[row], [vocabulary[term] for term in terms], 1)
+
+    doc_len = tf.sum(axis=1)
+    avg_len = doc_len.mean() or 1.0
+    df = (tf > 0).sum(axis=0)
+    idf = np.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+
+    query_terms = [vocabulary[term] for term in set(tokenize(query)) if term in vocabulary]
+    if not query_terms:
+        return np.zeros(len(docs))
+    tf_q = tf[:, query_terms]
+    norm = k1 * (1 - b + b * doc_len / avg_len)
+    return (idf[query_terms] * tf_q * (k1 + 1) / (tf_q + norm[:, None])).sum(axis=1)
+
+def select_for_scoring(resume, descriptions, top_k=None, min_relevance=None):
+    """Indexes of the descriptions worth sending to Claude, best first, and the
+    relevance of every description (BM25 relative to the best, 0 to 1)"""
+    scores = bm25_scores(resume, descriptions)
+    best = scores.max() if len(scores) else 0
+    relevance = scores / best if best > 0 else scores
+    order = np.argsort(-relevance, kind="stable")
+    order = order[relevance[order] > 0]  # No terms in common with the resume
+    if min_relevance is not None:
+        order = order[relevance[order] >= min_relevance]
+    if top_k is not None:
+        order = order[:top_k]
+    return [int(i) for i in order], relevance
+
+if __name__ == "__main__":
+    import sqlite3
+    with open("resume.txt", "r", encoding="utf-8") as file:
+        resume = file.read()
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else "craigslist_jobs.db")
+    rows = conn.execute("SELECT job, description FROM jobs WHERE description != 'No description found'").fetchall()
+    conn.close()
+    top_k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    selected, relevance = select_for_scoring(resume, [description for _, description in rows], top_k=top_k)
+    for i in selected:
+        print(f"{relevance[i]:.2f}  {rows[i][0]}")
@@ -0,0 +1,293 @@
+"""
+Async compatibility scoring
+Scores job descriptions against a resume with anthropic.AsyncAnthropic, many
+requests in flight at once: a semaphore bounds the number in flight, token
+buckets keep under the requests-per-minute and input-tokens-per-minute
+limits, and rate limits, server errors (including 529 overloaded), timeouts
+and dropped connections are retried with exponential backoff. With a
+ScoreCache, answers already stored for the same resume and posting are
+returned without a request. FakeAsyncClient stands in for the API offline.
+"""
+
+import asyncio
+import os
+import random
+import re
+from types import SimpleNamespace
+import anthropic
+import httpx
+from dotenv import load_dotenv
+from pacing import TokenBucket
+from score_cache import parse_tag, score_key
+
+load_dotenv()
+
+score_model = "claude-opus-4-20250514"
+score_max_tokens = 1000
+# Bump when score_system/score_instructions change so cached answers aren't reused
+score_template_version = 4
+score_template_id = f"job_scoring/{score_template_version}"
+# Retried along with every 5xx and connection error, as the SDK's own retries would
+retry_statuses = (408, 409, 429)
+# Shortest prompt prefix Opus will cache; a shorter cache_control block is ignored
+min_cache_tokens = 1024
+
+score_system = "You are a world-class Job Analyst. You can see the jobs and people behind the resumes, and can understand whether or not a given job and person would be a good match."
+
+# Everything that is the same for every job goes in the system prompt, ahead
+# of the posting, as one block marked with cache_control so only the posting
+# is new input on each call. check_cache_prefix warns when that block is too
+# short for the model to cache it.
+score_instructions = """
+You are an AI assistant tasked with creating a "Match Score" between a user's description of their resume and a job posting. Your goal is to analyze both inputs and determine how well the candidate's qualifications align with the job requirements.
+
+Each message will contain one job posting within <job_posting> tags. To create an accurate Match Score, follow these steps:
+
+1. Analyze the job posting to identify key requirements, skills, and qualifications.
+2. Compare these requirements to the information provided in the resume description.
+3. Consider both hard skills (technical abilities, certifications, etc.) and soft skills (communication, teamwork, etc.) mentioned in both the resume and job posting.
+4. Evaluate the level of experience required in the job posting and compare it to the candidate's experience level.
+5. Look for any specific achievements or accomplishments in the resume that directly relate to the job requirements.
+
+Before providing your final Match Score, use the <scratchpad> tags to think through your analysis and comparison. Consider the strengths and weaknesses of the match, and any areas where the candidate exceeds or falls short of the job requirements.
+
+Finally, provide a numerical Match Score as a percentage, where 100% represents a perfect match and 0% represents no match at all. Consider all aspects of your analysis when determining this score. Present your Match Score within <match_score> tags.
+
+<match_score>
+[Your Match Score here]
+</match_score>
+
+Remember to be objective and thorough in your analysis, considering all aspects of both the resume description and job posting when determining the Match Score.
+
+Here is the resume description you will compare every job posting against:
+
+<resume_description>
+{resume}
+</resume_description>
+"""
+
+score_posting = """
+Read the following job posting and give its Match Score against the resume description:
+
+<job_posting>
+{job_description}
+</job_posting>
+"""
+
+def score_system_blocks(resume):
+    """The stable prefix: system prompt, instructions and resume, cached as one"""
+    return [{'type': 'text', 'text': score_system + "\n" + score_instructions.format(resume=resume),
+             'cache_control': {'type': 'ephemeral'}}]
+
+def score_request(resume, job_description):
+    """messages.create arguments for scoring one job description"""
+    return {
+        'model': score_model,
+        'max_tokens': score_max_tokens,
+        'temperature': 1,
+        'system': score_system_blocks(resume),
+        'messages': [{
+            'role': 'user',
+            'content': [{'type': 'text', 'text': score_posting.format(job_description=job_description)}],
+        }],
+    }
+
+def request_text(request):
+    """All the prompt text of a request, system first"""
+    system = request['system']
+    if not isinstance(system, str):
+        system = "".join(block['text'] for block in system)
+    return system + "".join(block['text'] for message in request['messages'] for block in message['content'])
+
+def estimate_tokens(request):
+    """Rough input token count of a request, about 4 characters per token"""
+    return len(request_text(request)) // 4 + 1
+
+def usage_record(message):
+    """Token counts of one call, including how much of the prompt was read
+    from (cache_read) or written to (cache_creation) the prompt cache"""
+    usage = message.usage
+    return {
+        'input_tokens': usage.input_tokens,
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+        'output_tokens': usage.output_tokens,
+    }
+
+def response_text(message):
+    return "".join(block.text for block in message.content if block.type == "text")
+
+def parse_match_score(text):
+    """The Match Score inside <match_score> tags, e.g. "85%", or None"""
+    return parse_tag(text, "match_score")
+
+def is_retryable(error):
+    """True for errors a later attempt may not hit: rate limits, server
+    errors and overloads, timeouts and connection failures"""
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in retry_statuses or error.status_code >= 500
+    return isinstance(error, anthropic.APIConnectionError)
+
+def retry_delay(error, attempt, base=1.0, cap=60.0):
+    """Seconds to wait before retrying: the server's retry-after if it sent
+    one, otherwise exponential backoff with full jitter"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class AsyncScorer:
+    """Scores job descriptions concurrently within the API's rate limits
+
+    concurrency bounds requests in flight; rpm and tpm are the requests and
+    input tokens allowed per minute. The client's own retries are turned off
+    so backoff happens here, outside the semaphore's slot count.
+    cache is an optional score_cache.ScoreCache.
+    """
+    def __init__(self, client=None, concurrency=8, rpm=50, tpm=40000, max_retries=6, cache=None):
+        self.client = client or anthropic.AsyncAnthropic(api_key=os.getenv("CLAUDE_API_KEY"), max_retries=0)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests = TokenBucket(rpm / 60, capacity=rpm)
+        self.tokens = TokenBucket(tpm / 60, capacity=tpm)
+        self.max_retries = max_retries
+        self.retries = 0
+        self.cache = cache
+        self.pending = {}
+        # usage_record of every call made, for prompt cache hit/miss accounting
+        self.usage = []
+        self.checked_prefixes = set()
+
+    async def wait_for_budget(self, token_count):
+        delay = max(self.requests.reserve(), self.tokens.reserve(token_count))
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def create(self, request):
+        """messages.create with rate limiting and retries; returns the message"""
+        token_count = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            await self.wait_for_budget(token_count)
+            async with self.semaphore:
+                try:
+                    message = await self.client.messages.create(**request)
+                    self.usage.append(usage_record(message))
+                    return message
+                except anthropic.APIError as e:
+                    if not is_retryable(e) or attempt == self.max_retries:
+                        raise
+                    reason = getattr(e, "status_code", None) or type(e).__name__
+                    delay = retry_delay(e, attempt)
+            self.retries += 1
+            print(f"API returned {reason}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def score(self, resume, job_description):
+        """The model's full answer for one job description"""
+        if not self.cache:
+            return response_text(await self.create(score_request(resume, job_description)))
+        key = score_key(score_model, score_template_id, resume, job_description)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        # A repeat of a posting that is still being scored waits for that answer
+        owner = key not in self.pending
+        if owner:
+            self.pending[key] = asyncio.ensure_future(self.create(score_request(resume, job_description)))
+        try:
+            answer = response_text(await asyncio.shield(self.pending[key]))
+        finally:
+            if owner:
+                self.pending.pop(key, None)
+        if owner:
+            self.cache.put(key, score_model, answer)
+        return answer
+
+    async def check_cache_prefix(self, resume):
+        """Warn, once per resume, when the cache_control prefix is too short
+        to be cached; returns its token count from messages.count_tokens"""
+        if resume in self.checked_prefixes:
+            return None
+        self.checked_prefixes.add(resume)
+        request = score_request(resume, "")
+        try:
+            counted = await self.client.messages.count_tokens(model=request['model'], system=request['system'],
+                                                              messages=request['messages'])
+        except anthropic.APIError as e:
+            print(f"Couldn't count the prompt prefix tokens: {e}")
+            return None
+        # The posting message is the only part after the prefix
+        prefix_tokens = counted.input_tokens - estimate_tokens({'system': "", 'messages': request['messages']})
+        if prefix_tokens < min_cache_tokens:
+            print(f"Warning: the cached prompt prefix is about {prefix_tokens} tokens, under the "
+                  f"{min_cache_tokens} Opus needs, so every call pays for it in full")
+        return prefix_tokens
+
+    def usage_summary(self):
+        """Token totals over every call so far"""
+        totals = {}
+        for record in self.usage:
+            for name, count in record.items():
+                totals[name] = totals.get(name, 0) + count
+        totals['calls'] = len(self.usage)
+        if self.usage and not totals['cache_read_input_tokens'] and not totals['cache_creation_input_tokens']:
+            print(f"Warning: none of the {len(self.usage)} calls read or wrote the prompt cache")
+        return totals
+
+    async def score_all(self, resume, job_descriptions):
+        """Answers for every description, in order"""
+        if job_descriptions:
+            await self.check_cache_prefix(resume)
+        return await asyncio.gather(*(self.score(resume, description) for description in job_descriptions))
+
+class FakeAsyncClient:
+    """Offline stand-in for AsyncAnthropic: answers with a word-overlap score
+    after `latency` seconds, and returns 429s for the first `fail_first` calls.
+    Usage reports the cache_control prefix as written on first sight and
+    read from the prompt cache after that."""
+    def __init__(self, latency=0.05, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls = 0
+        self.cached_prefixes = set()
+        self.messages = self
+
+    def fake_usage(self, request, text):
+        blocks = request['system'] if isinstance(request['system'], list) else []
+        marked = [i for i, block in enumerate(blocks) if 'cache_control' in block]
+        prefix = "".join(block['text'] for block in blocks[:marked[-1] + 1]) if marked else ""
+        total = len(request_text(request)) // 4
+        cached = len(prefix) // 4
+        read = prefix in self.cached_prefixes
+        self.cached_prefixes.add(prefix)
+        return SimpleNamespace(input_tokens=total - cached, output_tokens=len(text) // 4,
+                               cache_creation_input_tokens=0 if read else cached,
+                               cache_read_input_tokens=cached if read else 0)
+
+    async def create(self, **request):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.latency)
+        if call <= self.fail_first:
+            response = httpx.Response(429, request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"))
+            raise anthropic.RateLimitError("rate limited (fake)", response=response, body=None)
+        text = f"<match_score>{fake_match_score(request_text(request))}%</match_score>"
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=self.fake_usage(request, text))
+
+    async def count_tokens(self, **request):
+        return SimpleNamespace(input_tokens=estimate_tokens(request))
+
+def last_tag_text(prompt, tag):
+    """Text in the last <tag>...</tag> of a prompt (the instructions mention the tags too)"""
+    start = prompt.rfind(f"<{tag}>")
+    end = prompt.rfind(f"</{tag}>")
+    return prompt[start + len(tag) + 2:end] if 0 <= start < end else ""
+
+def fake_match_score(prompt):
+    """Share of the posting's words that also appear in the resume"""
+    resume_words = set(re.findall(r'[a-z]+', last_tag_text(prompt, 'resume_description').lower()))
+    posting_words = set(re.findall(r'[a-z]+', last_tag_text(prompt, 'job_posting').lower()))
+    return round(100 * len(posting_words & resume_words) / len(posting_words)) if posting_words else 0
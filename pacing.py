@@ -0,0 +1,78 @@
+"""
+Shared pacing for the Playwright scrapers
+Replaces the fixed random_sleep pauses that were copied into every scraper:
+pages are waited on with selectors/responses (see page_setup), and how often
+we hit a host is set explicitly with a per-host token bucket.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+from page_setup import goto_ready, goto_ready_async
+
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of up to `capacity`"""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+
+    def reserve(self, count=1):
+        """Take count tokens and return how many seconds to wait before using them"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens -= count
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class RateLimiter:
+    """One token bucket per host"""
+    def __init__(self, rate=0.5, burst=2):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def _bucket(self, url_or_host):
+        host = urlsplit(url_or_host).hostname or url_or_host
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    def wait(self, url_or_host):
+        """Block until a request to this host is allowed"""
+        delay = self._bucket(url_or_host).reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self, url_or_host):
+        delay = self._bucket(url_or_host).reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+# Default politeness for the Indeed scrapers: one navigation every 2 seconds
+# per host on average, bursts of 2
+limiter = RateLimiter(rate=0.5, burst=2)
+
+def paced_goto(page, url, ready_selector=None, timeout=30000, limiter=limiter):
+    """Wait for the host's rate limit, then goto_ready"""
+    limiter.wait(url)
+    return goto_ready(page, url, ready_selector, timeout)
+
+async def paced_goto_async(page, url, ready_selector=None, timeout=30000, limiter=limiter):
+    await limiter.wait_async(url)
+    return await goto_ready_async(page, url, ready_selector, timeout)
+
+def paced_click_navigation(page, element, timeout=30000, limiter=limiter):
+    """Click something that loads a new page (search submit, next page),
+    counting it against the rate limit and returning once the new document
+    has loaded"""
+    limiter.wait(page.url)
+    with page.expect_navigation(wait_until="domcontentloaded", timeout=timeout):
+        element.click()
+
+def paced_start(page, url, timeout=30000, limiter=limiter):
+    """Wait for the host's rate limit and start loading url, returning as soon
+    as the response starts so the page keeps loading while the caller works"""
+    limiter.wait(url)
+    return page.goto(url, wait_until="commit", timeout=timeout)
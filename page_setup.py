@@ -0,0 +1,71 @@
+"""
+Shared Playwright page setup
+Fast mode routes every request through a policy that aborts images, media,
+fonts (optionally stylesheets) and known third-party trackers, and the goto
+helpers return as soon as a given selector is in the DOM instead of waiting
+for networkidle. Sync and async variants take the same arguments.
+"""
+
+from urllib.parse import urlsplit
+
+blocked_resource_types = ("image", "media", "font")
+
+tracker_domains = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "segment.io",
+    "nr-data.net",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "cookielaw.org",
+    "onetrust.com",
+)
+
+def should_block(request, block_stylesheets=False):
+    """True if the request is a heavy resource or a tracker the scrapers don't need"""
+    if request.resource_type in blocked_resource_types:
+        return True
+    if block_stylesheets and request.resource_type == "stylesheet":
+        return True
+    host = urlsplit(request.url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in tracker_domains)
+
+def enable_fast_mode(target, block_stylesheets=False):
+    """Install the blocking policy on a sync Page or BrowserContext"""
+    def handle(route):
+        if should_block(route.request, block_stylesheets):
+            route.abort()
+        else:
+            route.continue_()
+    target.route("**/*", handle)
+
+async def enable_fast_mode_async(target, block_stylesheets=False):
+    """Install the blocking policy on an async Page or BrowserContext"""
+    async def handle(route):
+        if should_block(route.request, block_stylesheets):
+            await route.abort()
+        else:
+            await route.continue_()
+    await target.route("**/*", handle)
+
+def goto_ready(page, url, ready_selector=None, timeout=30000):
+    """Navigate and return once ready_selector is in the DOM (or at
+    DOMContentLoaded if there is none), instead of waiting for networkidle"""
+    response = page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+    if ready_selector:
+        page.wait_for_selector(ready_selector, state="attached", timeout=timeout)
+    return response
+
+async def goto_ready_async(page, url, ready_selector=None, timeout=30000):
+    """Async goto_ready"""
+    response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+    if ready_selector:
+        await page.wait_for_selector(ready_selector, state="attached", timeout=timeout)
+    return response
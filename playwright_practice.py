@@ -1,16 +1,21 @@
 from playwright.sync_api import sync_playwright
+from page_setup import enable_fast_mode, goto_ready
 import sqlite3
 
+# Craigslist search result cards
+cl_result_selector = "div.cl-search-result.cl-search-view-mode-thumb"
         
-def visit_seed_web_page(page_to_visit, browser):
+def visit_seed_web_page(page_to_visit, browser, ready_selector=cl_result_selector, fast=True):
     playwrightPage = None
     playwrightPage = browser.new_page()
-    playwrightPage.goto(page_to_visit, wait_until="networkidle")  # Wait until page is fully loaded
+    if fast:
+        enable_fast_mode(playwrightPage)  # Skip images, fonts, media and trackers
+    goto_ready(playwrightPage, page_to_visit, ready_selector)  # Ready once the results are in the DOM
     return playwrightPage
 
 def get_all_link_elements_from_page(playwrightPage):
        
-    matchingSearchResultsOnPage = playwrightPage.query_selector_all("div.cl-search-result.cl-search-view-mode-thumb")
+    matchingSearchResultsOnPage = playwrightPage.query_selector_all(cl_result_selector)
     print("number of links found on page", len(matchingSearchResultsOnPage))
 
     return matchingSearchResultsOnPage
@@ -1,12 +1,13 @@
 from playwright.sync_api import sync_playwright
 import random
-import time
 from datetime import datetime
 import os
 from playwright_stealth import stealth  # Correct import
 import asyncio
 from playwright.async_api import async_playwright
 from playwright_stealth import stealth_async
+from dom_extract import wait_for_cards
+from pacing import paced_goto
 
 
 seed_page = "https://www.indeed.com/"
@@ -18,10 +19,6 @@ user_agents = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 ]
 
-def random_sleep(a, b):
-    """Sleep for a random time to mimic human behavior"""
-    time.sleep(random.uniform(a, b))
-
 async def main():
     with sync_playwright() as p:
         # Rotate user agent
@@ -46,17 +43,12 @@ async def main():
         visitPage = context.new_page()
 
         try:
-            visitPage.goto(seed_page, timeout=60000)  # 60-second timeout to wait for page loading
-
-            # Random delay between actions to simulate human-like behavior
-            random_sleep(1, 2)
-            visitPage.wait_for_selector("#text-input-what", timeout=30000)  # Wait for the selector to appear
+            # Rate-limited load that returns as soon as the search box is there
+            paced_goto(visitPage, seed_page, "#text-input-what", timeout=60000)
             visitPage.fill("#text-input-what", "Software Engineer")
 
-            random_sleep(1, 2)
             visitPage.click('button >> text="Search"')
-
-            random_sleep(17, 20)
+            wait_for_cards(visitPage)
 
             # Ensure the 'results_folder' exists before writing the file
             if not os.path.exists("results_folder"):
@@ -71,7 +63,6 @@ async def main():
             print(f"An error occurred: {e}")
 
         finally:
-            time.sleep(5)
             browser.close()
 
 # Run the main function
@@ -5,18 +5,17 @@ Scrapes Indeed.com for software engineering internship positions in Richmond, VA
 """
 
 from playwright.sync_api import sync_playwright
+from dom_extract import absolute_indeed_url, card_job_key, extract_cards, extract_field, find_cards, recorded_job_keys, record_seen_jobs, seen_job_keys, setup_seen_jobs, wait_for_cards
+from page_setup import enable_fast_mode
+from pacing import paced_click_navigation, paced_goto
+from indeed_selectors import registry
+from job_payloads import ResponseCapture, first_records, indeed_extra_fields, indeed_records_from_text
 import csv
 import json
 import sqlite3
-import time
-import random
 from datetime import datetime
 import re
 
-def random_sleep(min_seconds, max_seconds):
-    """Sleep for a random duration to appear more human-like"""
-    time.sleep(random.uniform(min_seconds, max_seconds))
-
 def setup_database():
     """Set up SQLite database for job storage"""
     conn = sqlite3.connect("richmond_internships.db")
@@ -35,6 +34,8 @@ def setup_database():
             scraped_at TEXT
         )
     """)
+    # Keys of irrelevant cards too, so repeat runs don't extract them again
+    setup_seen_jobs(cur)
 
     conn.commit()
     return conn, cur
@@ -61,11 +62,21 @@ def save_results(jobs_data, format_type="all"):
             json.dump(jobs_data, jsonfile, indent=2, ensure_ascii=False)
         print(f"JSON saved: {json_filename}")
 
-def scrape_indeed_internships():
-    """Main scraping function with improved error handling"""
+def scrape_indeed_internships(batch_extract=True, capture_payloads=False):
+    """Main scraping function with improved error handling
+
+    batch_extract reads every job card in one page.evaluate call; set it to
+    False to query each card's fields one element handle at a time.
+    capture_payloads builds the jobs from the job card JSON in the page's
+    responses (see job_payloads) and only reads the DOM when there is none.
+    Cards whose job key is already in the database are skipped before
+    extraction, so repeat runs only read new postings.
+    """
 
     # Setup database
     conn, cur = setup_database()
+    seen = seen_job_keys(cur) | recorded_job_keys(cur)
+    print(f"{len(seen)} jobs already seen")
 
     jobs_data = []
 
@@ -87,13 +98,16 @@ def scrape_indeed_internships():
             }
         )
 
+        # Skip images, fonts, media and trackers
+        enable_fast_mode(context)
+
         page = context.new_page()
+        capture = ResponseCapture(hosts=["indeed.com"]).attach(page) if capture_payloads else None
 
         try:
             # Start with Indeed homepage first
             print("Loading Indeed homepage...")
-            page.goto("https://www.indeed.com", wait_until='networkidle')
-            random_sleep(2, 4)
+            paced_goto(page, "https://www.indeed.com", '#text-input-what')
 
             # Fill search form manually to be more human-like
             print("Filling search form...")
@@ -104,60 +118,60 @@ def scrape_indeed_internships():
             if what_box:
                 print("Job search box found...")
                 what_box.click()
-                random_sleep(0.5, 1)
                 what_box.fill('software engineering internship')
-                random_sleep(1, 2)
 
             # Fill location box
             where_box = page.query_selector('#text-input-where')
             if where_box:
                 where_box.click()
-                random_sleep(0.5, 1)
                 # Clear existing text first
                 where_box.press('Control+a')
                 where_box.press('Delete')
-                random_sleep(0.5, 1)
                 where_box.fill('Richmond, VA')
-                random_sleep(1, 2)
 
             # Click search button
             
             search_button = page.query_selector('button[type="submit"]')
             if search_button:
-                search_button.click()
+                paced_click_navigation(page, search_button)
                 print("Search submitted, waiting for results...")
-                page.wait_for_load_state('domcontentloaded', timeout=30000)
-                random_sleep(3, 5)
-
-            # Look for job results with multiple fallback selectors
-            job_selectors = [
-                'div[data-jk]',
-                '.jobsearch-SerpJobCard',
-                '.job_seen_beacon',
-                '[data-testid="job-result"]',
-                '.slider_container .slider_item',
-                'table[role="table"] tr',
-                '.jobsearch-ResultsList .result'
-            ]
-
-            job_elements = []
-            for selector in job_selectors:
-                job_elements = page.query_selector_all(selector)
-                if job_elements:
-                    print(f"Found {len(job_elements)} job listings using selector: {selector}")
-                    break
-
-            if not job_elements:
-                print("No job elements found. Saving page for debugging...")
-                with open('indeed_debug.html', 'w', encoding='utf-8') as f:
-                    f.write(page.content())
-                print("Page saved as indeed_debug.html")
-                return []
-
-            # Extract job data
-            for i, job_elem in enumerate(job_elements):
+                if not wait_for_cards(page, timeout=30000):
+                    print("No job cards appeared before the timeout")
+
+            extracted = None
+            if capture:
+                records = first_records(capture.texts(), indeed_records_from_text)
+                if records:
+                    print(f"Read {len(records)} job listings from the job card data")
+                    extracted = [job_from_record(record) for record in records if record['job_key'] not in seen]
+                else:
+                    print("No job card data in the responses, reading the page instead")
+
+            if extracted is None:
+                # Look for job results with multiple fallback selectors
+                card_selector, job_elements = find_cards(page)
+
+                if not job_elements:
+                    print("No job elements found. Saving page for debugging...")
+                    with open('indeed_debug.html', 'w', encoding='utf-8') as f:
+                        f.write(page.content())
+                    print("Page saved as indeed_debug.html")
+                    return []
+
+                print(f"Found {len(job_elements)} job listings using selector: {card_selector}")
+
+                # Extract job data for the cards not stored yet
+                if batch_extract:
+                    extracted = extract_all_job_info(page, card_selector, skip_keys=seen)
+                else:
+                    extracted = [elem for elem in job_elements if card_job_key(elem) not in seen]
+                print(f"{len(job_elements) - len(extracted)} already seen, extracting {len(extracted)}")
+
+            for i, job_elem in enumerate(extracted):
                 try:
-                    job_data = extract_job_info(job_elem)
+                    job_data = job_elem if isinstance(job_elem, dict) else extract_job_info(job_elem)
+                    if job_data:
+                        record_seen_jobs(cur, [job_data])
                     if job_data and is_relevant_internship(job_data):
                         jobs_data.append(job_data)
                         print(f"{len(jobs_data)}. {job_data['title']} at {job_data['company']}")
@@ -190,6 +204,7 @@ def scrape_indeed_internships():
 
         finally:
             browser.close()
+            registry.save_stats()
 
     # Commit database changes
     conn.commit()
@@ -208,114 +223,39 @@ def scrape_indeed_internships():
 
     return jobs_data
 
+# Job card fields, read with the shared selector registry (indeed_selectors.json)
+job_field_names = ['title', 'company', 'location', 'salary', 'snippet', 'job_url']
+
+def job_from_record(record):
+    """Turn an extracted {field: value or None} record into the job dict
+    returned by extract_job_info"""
+    job = {
+        'title': record['title'] or "N/A",
+        'company': record['company'] or "N/A",
+        'location': record['location'] or "N/A",
+        'salary': record['salary'] or "N/A",
+        'description': record['snippet'] or "N/A",
+        'job_url': absolute_indeed_url(record['job_url'], record.get('job_key')),
+        'scraped_at': datetime.now().isoformat()
+    }
+    # The job key, plus the fields the cards don't show for records read
+    # from the job card data
+    job.update({name: record[name] for name in indeed_extra_fields if name in record})
+    return job
+
+def extract_all_job_info(page, card_selector, skip_keys=()):
+    """Extract every job card matching card_selector in one browser round
+    trip, leaving out cards whose job key is in skip_keys"""
+    fields = registry.fields(job_field_names)
+    return [job_from_record(record) for record in extract_cards(page, card_selector, fields, skip_keys=skip_keys)]
+
 def extract_job_info(job_element):
     """Extract job information from a job element"""
     try:
-        # Extract title with multiple fallback selectors
-        title_selectors = [
-            'h2 a span[title]',
-            'h2 a span',
-            'h2 span',
-            '.jobTitle a',
-            '.jobTitle span',
-            'a[data-jk] span'
-        ]
-
-        title = "N/A"
-        for selector in title_selectors:
-            elem = job_element.query_selector(selector)
-            if elem:
-                title = elem.get_attribute('title') or elem.inner_text().strip()
-                if title and title != "N/A":
-                    break
-
-        # Extract company
-        company_selectors = [
-            '[data-testid="company-name"] a',
-            '[data-testid="company-name"]',
-            '.companyName a',
-            '.companyName span',
-            '.companyName'
-        ]
-
-        company = "N/A"
-        for selector in company_selectors:
-            elem = job_element.query_selector(selector)
-            if elem:
-                company = elem.inner_text().strip()
-                if company and company != "N/A":
-                    break
-
-        # Extract location
-        location_selectors = [
-            '[data-testid="job-location"]',
-            '.companyLocation',
-            '.locationsContainer'
-        ]
-
-        location = "N/A"
-        for selector in location_selectors:
-            elem = job_element.query_selector(selector)
-            if elem:
-                location = elem.inner_text().strip()
-                if location and location != "N/A":
-                    break
-
-        # Extract salary
-        salary_selectors = [
-            '[data-testid="attribute_snippet_testid"]',
-            '.salaryText',
-            '.salary-snippet'
-        ]
-
-        salary = "N/A"
-        for selector in salary_selectors:
-            elem = job_element.query_selector(selector)
-            if elem:
-                salary = elem.inner_text().strip()
-                if salary and salary != "N/A":
-                    break
-
-        # Extract description/snippet
-        desc_selectors = [
-            '[data-testid="job-snippet"]',
-            '.summary',
-            '.jobSnippet'
-        ]
-
-        description = "N/A"
-        for selector in desc_selectors:
-            elem = job_element.query_selector(selector)
-            if elem:
-                description = elem.inner_text().strip()
-                if description and description != "N/A":
-                    break
-
-        # Extract job URL
-        url_selectors = [
-            'h2 a',
-            '.jobTitle a',
-            'a[data-jk]'
-        ]
-
-        job_url = "N/A"
-        for selector in url_selectors:
-            elem = job_element.query_selector(selector)
-            if elem:
-                href = elem.get_attribute('href')
-                if href:
-                    job_url = f"https://www.indeed.com{href}" if href.startswith('/') else href
-                    break
-
-        return {
-            'title': title,
-            'company': company,
-            'location': location,
-            'salary': salary,
-            'description': description,
-            'job_url': job_url,
-            'scraped_at': datetime.now().isoformat()
-        }
+        record = {name: extract_field(job_element, name) for name in job_field_names}
+        # Sponsored cards link through /pagead/clk without a jk
+        record['job_key'] = card_job_key(job_element)
+        return job_from_record(record)
 
     except Exception as e:
         print(f"Error extracting job info: {e}")
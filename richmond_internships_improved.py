@@ -5,17 +5,16 @@ Enhanced anti-detection measures for Indeed.com scraping
 """
 
 from playwright.sync_api import sync_playwright
+from dom_extract import absolute_indeed_url, card_job_key, extract_cards, extract_field, find_cards, recorded_job_keys, record_seen_jobs, seen_job_keys, setup_seen_jobs, wait_for_cards
+from page_setup import enable_fast_mode
+from pacing import paced_click_navigation, paced_goto
+from indeed_selectors import registry
 import csv
 import json
 import sqlite3
-import time
 import random
 from datetime import datetime
 
-def random_sleep(min_seconds, max_seconds):
-    """Sleep for a random duration to appear more human-like"""
-    time.sleep(random.uniform(min_seconds, max_seconds))
-
 def setup_database():
     """Set up SQLite database for job storage"""
     conn = sqlite3.connect("richmond_internships.db")
@@ -34,6 +33,8 @@ def setup_database():
             scraped_at TEXT
         )
     """)
+    # Keys of irrelevant cards too, so repeat runs don't extract them again
+    setup_seen_jobs(cur)
 
     conn.commit()
     return conn, cur
@@ -60,10 +61,15 @@ def save_results(jobs_data):
         json.dump(jobs_data, jsonfile, indent=2, ensure_ascii=False)
     print(f"JSON saved: {json_filename}")
 
-def scrape_indeed_internships():
-    """Enhanced scraping function with better anti-detection"""
+def scrape_indeed_internships(batch_extract=True):
+    """Enhanced scraping function with better anti-detection
+
+    batch_extract reads every job card in one page.evaluate call; set it to
+    False to query each card's fields one element handle at a time
+    """
 
     conn, cur = setup_database()
+    seen = seen_job_keys(cur) | recorded_job_keys(cur)
     jobs_data = []
 
     with sync_playwright() as p:
@@ -107,17 +113,17 @@ def scrape_indeed_internships():
             });
         """)
 
+        # Skip images, fonts, media and trackers
+        enable_fast_mode(context)
+
         page = context.new_page()
 
         try:
             print("Step 1: Loading Indeed homepage with enhanced stealth...")
 
             # Go to Indeed homepage first and simulate human behavior
-            page.goto("https://www.indeed.com", timeout=60000)
-
-            # Wait for page to fully load
-            page.wait_for_load_state('networkidle', timeout=30000)
-            random_sleep(3, 6)
+            # Ready as soon as the search box is there, not at networkidle
+            paced_goto(page, "https://www.indeed.com", 'input[name="q"], #text-input-what', timeout=60000)
 
             # Check if we're blocked or redirected
             current_url = page.url
@@ -129,7 +135,6 @@ def scrape_indeed_internships():
 
             # Simulate human mouse movements
             page.mouse.move(random.randint(100, 500), random.randint(100, 300))
-            random_sleep(1, 2)
 
             print("Step 2: Filling search form...")
 
@@ -138,45 +143,26 @@ def scrape_indeed_internships():
                 # Wait for the job search input
                 what_input = page.wait_for_selector('input[name="q"], #text-input-what', timeout=15000)
                 if what_input:
-                    # Click and clear first
+                    # Click, then replace whatever is in the box
                     what_input.click()
-                    random_sleep(0.5, 1)
-                    what_input.press('Control+a')
-                    random_sleep(0.2, 0.5)
-
-                    # Type slowly like a human
-                    search_term = "software engineering internship"
-                    for char in search_term:
-                        what_input.type(char)
-                        random_sleep(0.05, 0.15)
-
-                    random_sleep(1, 2)
+                    what_input.fill("software engineering internship")
 
                 # Handle location field
                 where_input = page.query_selector('input[name="l"], #text-input-where')
                 if where_input:
                     where_input.click()
-                    random_sleep(0.5, 1)
-                    where_input.press('Control+a')
-                    random_sleep(0.2, 0.5)
-
-                    location_term = "Richmond, VA"
-                    for char in location_term:
-                        where_input.type(char)
-                        random_sleep(0.05, 0.15)
-
-                    random_sleep(1, 2)
+                    where_input.fill("Richmond, VA")
 
                 # Submit search
                 search_button = page.query_selector('button[type="submit"], .yosegi-InlineWhatWhere-primaryButton')
                 if search_button:
                     print("Step 3: Submitting search...")
-                    search_button.click()
+                    paced_click_navigation(page, search_button, timeout=45000)
 
                     # Wait for results page to load
                     print("Step 4: Waiting for results...")
-                    page.wait_for_load_state('networkidle', timeout=45000)
-                    random_sleep(5, 8)
+                    if not wait_for_cards(page, timeout=45000):
+                        print("No job cards appeared before the timeout")
 
             except Exception as e:
                 print(f"Error with search form: {e}")
@@ -193,25 +179,10 @@ def scrape_indeed_internships():
             # Look for job results
             print("Step 5: Looking for job listings...")
 
-            # Multiple selectors to try
-            selectors = [
-                '.job_seen_beacon',
-                'div[data-jk]',
-                '.jobsearch-SerpJobCard',
-                '[data-testid="job-result"]',
-                '.slider_container .slider_item'
-            ]
-
-            job_elements = []
-            for selector in selectors:
-                try:
-                    elements = page.query_selector_all(selector)
-                    if elements:
-                        job_elements = elements
-                        print(f"✅ Found {len(job_elements)} jobs using: {selector}")
-                        break
-                except:
-                    continue
+            # Card selectors come from the shared registry, best hit rate first
+            card_selector, job_elements = find_cards(page)
+            if job_elements:
+                print(f"✅ Found {len(job_elements)} jobs using: {card_selector}")
 
             if not job_elements:
                 print("❌ No job elements found. Saving debug page...")
@@ -228,10 +199,18 @@ def scrape_indeed_internships():
 
             print(f"Step 6: Processing {len(job_elements)} job listings...")
 
-            # Process each job
-            for i, job_elem in enumerate(job_elements[:10]):  # Limit to first 10 for testing
+            # Process each job not stored by an earlier run
+            if batch_extract:
+                extracted = extract_all_job_info(page, card_selector, skip_keys=seen)
+            else:
+                extracted = [elem for elem in job_elements if card_job_key(elem) not in seen]
+            print(f"{len(job_elements) - len(extracted)} already seen, extracting {len(extracted)}")
+
+            for i, job_elem in enumerate(extracted[:10]):  # Limit to first 10 for testing
                 try:
-                    job_data = extract_job_info(job_elem)
+                    job_data = job_elem if batch_extract else extract_job_info(job_elem)
+                    if job_data:
+                        record_seen_jobs(cur, [job_data])
                     if job_data and is_internship(job_data):
                         jobs_data.append(job_data)
                         print(f"✅ {len(jobs_data)}. {job_data['title']} at {job_data['company']}")
@@ -272,6 +251,7 @@ def scrape_indeed_internships():
         finally:
             print("Closing browser...")
             browser.close()
+            registry.save_stats()
 
     # Save results
     conn.commit()
@@ -292,79 +272,34 @@ def scrape_indeed_internships():
 
     return jobs_data
 
+# Job card fields, read with the shared selector registry (indeed_selectors.json)
+job_field_names = ['title', 'company', 'location', 'salary', 'snippet', 'job_url']
+
+def job_from_record(record):
+    """Turn an extracted {field: value or None} record into a job dict"""
+    return {
+        'title': record['title'] or "N/A",
+        'company': record['company'] or "N/A",
+        'location': record['location'] or "N/A",
+        'salary': record['salary'] or "N/A",
+        'snippet': record['snippet'] or "N/A",
+        'job_url': absolute_indeed_url(record['job_url'], record.get('job_key')),
+        'scraped_at': datetime.now().isoformat()
+    }
+
+def extract_all_job_info(page, card_selector, skip_keys=()):
+    """Extract every job card matching card_selector in one browser round
+    trip, leaving out cards whose job key is in skip_keys"""
+    fields = registry.fields(job_field_names)
+    return [job_from_record(record) for record in extract_cards(page, card_selector, fields, skip_keys=skip_keys)]
+
 def extract_job_info(job_element):
     """Extract job information with robust selectors"""
     try:
-        # Title extraction
-        title_selectors = ['h2 a span[title]', 'h2 a span', '.jobTitle a span', '.jobTitle span']
-        title = "N/A"
-        for sel in title_selectors:
-            elem = job_element.query_selector(sel)
-            if elem:
-                title = elem.get_attribute('title') or elem.inner_text().strip()
-                if title and len(title) > 2:
-                    break
-
-        # Company extraction
-        company_selectors = ['[data-testid="company-name"]', '.companyName']
-        company = "N/A"
-        for sel in company_selectors:
-            elem = job_element.query_selector(sel)
-            if elem:
-                company = elem.inner_text().strip()
-                if company and len(company) > 1:
-                    break
-
-        # Location extraction
-        location_selectors = ['[data-testid="job-location"]', '.companyLocation']
-        location = "N/A"
-        for sel in location_selectors:
-            elem = job_element.query_selector(sel)
-            if elem:
-                location = elem.inner_text().strip()
-                if location and len(location) > 1:
-                    break
-
-        # Salary extraction
-        salary_selectors = ['[data-testid="attribute_snippet_testid"]', '.salaryText']
-        salary = "N/A"
-        for sel in salary_selectors:
-            elem = job_element.query_selector(sel)
-            if elem:
-                salary = elem.inner_text().strip()
-                if salary and len(salary) > 1:
-                    break
-
-        # Snippet extraction
-        snippet_selectors = ['[data-testid="job-snippet"]', '.summary']
-        snippet = "N/A"
-        for sel in snippet_selectors:
-            elem = job_element.query_selector(sel)
-            if elem:
-                snippet = elem.inner_text().strip()
-                if snippet and len(snippet) > 5:
-                    break
-
-        # URL extraction
-        url_selectors = ['h2 a', '.jobTitle a']
-        job_url = "N/A"
-        for sel in url_selectors:
-            elem = job_element.query_selector(sel)
-            if elem:
-                href = elem.get_attribute('href')
-                if href:
-                    job_url = f"https://www.indeed.com{href}" if href.startswith('/') else href
-                    break
-
-        return {
-            'title': title,
-            'company': company,
-            'location': location,
-            'salary': salary,
-            'snippet': snippet,
-            'job_url': job_url,
-            'scraped_at': datetime.now().isoformat()
-        }
+        record = {name: extract_field(job_element, name) for name in job_field_names}
+        # Sponsored cards link through /pagead/clk without a jk
+        record['job_key'] = card_job_key(job_element)
+        return job_from_record(record)
 
     except Exception as e:
         print(f"Error extracting job info: {e}")
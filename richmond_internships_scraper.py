@@ -1,76 +1,49 @@
 from playwright.sync_api import sync_playwright
+from dom_extract import absolute_indeed_url, card_job_key, extract_field, find_cards, seen_job_keys, wait_for_cards
+from page_setup import enable_fast_mode
+from pacing import paced_start
+from indeed_selectors import registry
 import sqlite3
-import time
-import random
 import json
 import csv
+from collections import deque
 from datetime import datetime
 from urllib.parse import urlencode
 import re
 
-def random_sleep(min_seconds, max_seconds):
-    """Sleep for a random duration between min_seconds and max_seconds"""
-    time.sleep(random.uniform(min_seconds, max_seconds))
+# Indeed shows this many cards per results page; start= counts in cards
+results_per_page = 10
 
-def build_indeed_search_url(job_title, location, job_type="internship"):
-    """Build Indeed search URL with specific parameters for internships"""
+def build_indeed_search_url(query, location, job_type="internship", sort="date", start=0):
+    """Build an Indeed search URL for any query, location and job type
+
+    job_type is Indeed's jt filter (internship, fulltime, parttime, contract,
+    temporary); pass None to search every type. start is the result offset
+    of the page, a multiple of results_per_page.
+    """
     base_url = "https://www.indeed.com/jobs"
-    params = {
-        'q': f'{job_title} {job_type}',
-        'l': location,
-        'jt': 'internship',  # Job type filter for internships
-        'sort': 'date'  # Sort by most recent
-    }
+    params = {'q': query, 'l': location}
+    if job_type:
+        params['jt'] = job_type  # Job type filter
+    if sort:
+        params['sort'] = sort  # 'date' sorts by most recent
+    if start:
+        params['start'] = start
     return f"{base_url}?{urlencode(params)}"
 
-def extract_job_data(job_element):
-    """Extract job information from a job posting element"""
+def extract_job_data(job_element, job_key=None):
+    """Extract job information from a job posting element. With the card's
+    job key the URL is the canonical viewjob one even for sponsored cards,
+    whose links carry no jk"""
     try:
-        # Extract job title - try multiple selectors
-        title_element = (job_element.query_selector('h2 a span[title]') or
-                        job_element.query_selector('h2 a span') or
-                        job_element.query_selector('a[data-jk] span[title]') or
-                        job_element.query_selector('.jobTitle a span'))
-        title = title_element.get_attribute('title') or title_element.inner_text().strip() if title_element else "N/A"
-
-        # Extract company name - try multiple selectors
-        company_element = (job_element.query_selector('[data-testid="company-name"] a') or
-                          job_element.query_selector('[data-testid="company-name"]') or
-                          job_element.query_selector('.companyName a') or
-                          job_element.query_selector('.companyName'))
-        company = company_element.inner_text().strip() if company_element else "N/A"
-
-        # Extract location - try multiple selectors
-        location_element = (job_element.query_selector('[data-testid="job-location"]') or
-                           job_element.query_selector('.companyLocation'))
-        location = location_element.inner_text().strip() if location_element else "N/A"
-
-        # Extract job URL - try multiple selectors
-        link_element = (job_element.query_selector('h2 a') or
-                       job_element.query_selector('.jobTitle a') or
-                       job_element.query_selector('a[data-jk]'))
-
-        if link_element:
-            href = link_element.get_attribute('href')
-            job_url = f"https://www.indeed.com{href}" if href and href.startswith('/') else href
-        else:
-            job_url = "N/A"
-
-        # Extract salary if available
-        salary_element = (job_element.query_selector('[data-testid="attribute_snippet_testid"]') or
-                         job_element.query_selector('.salary-snippet') or
-                         job_element.query_selector('.salaryText'))
-        salary = salary_element.inner_text().strip() if salary_element else "N/A"
-
-        # Extract snippet/description preview
-        snippet_element = (job_element.query_selector('[data-testid="job-snippet"]') or
-                          job_element.query_selector('.summary'))
-        snippet = snippet_element.inner_text().strip() if snippet_element else "N/A"
-
-        # Extract posting date
-        date_element = (job_element.query_selector('[data-testid="myJobsStateDate"]') or
-                       job_element.query_selector('.date'))
-        posting_date = date_element.inner_text().strip() if date_element else "N/A"
+        # Each field tries the shared registry's fallback selectors in hit-rate order
+        title = extract_field(job_element, 'title') or "N/A"
+        company = extract_field(job_element, 'company') or "N/A"
+        location = extract_field(job_element, 'location') or "N/A"
+        job_url = absolute_indeed_url(extract_field(job_element, 'job_url'), job_key)
+        salary = extract_field(job_element, 'salary') or "N/A"
+        snippet = extract_field(job_element, 'snippet') or "N/A"
+        posting_date = extract_field(job_element, 'posting_date') or "N/A"
 
         return {
             'title': title,
@@ -124,14 +97,35 @@ def save_to_json(jobs_data, filename):
     with open(filename, 'w', encoding='utf-8') as jsonfile:
         json.dump(jobs_data, jsonfile, indent=2, ensure_ascii=False)
 
-def scrape_richmond_internships(max_pages=5, debug=False):
-    """Main scraping function for Richmond software engineering internships"""
+def is_software_internship(job_data):
+    """Check for internship and software keywords in the title and snippet"""
+    title_lower = job_data['title'].lower()
+    snippet_lower = job_data['snippet'].lower()
+
+    # Look for internship-related keywords
+    internship_keywords = ['intern', 'internship', 'co-op', 'coop', 'summer program', 'student']
+    software_keywords = ['software', 'developer', 'engineer', 'programming', 'coding', 'tech']
+
+    is_internship = any(keyword in title_lower or keyword in snippet_lower for keyword in internship_keywords)
+    is_software_related = any(keyword in title_lower or keyword in snippet_lower for keyword in software_keywords)
+    return is_internship and is_software_related
+
+def scrape_richmond_internships(max_pages=5, debug=False, prefetch=2):
+    """Main scraping function for Richmond software engineering internships
+
+    Results pages are addressed by their start= offset and the next
+    `prefetch` pages load in their own tabs while the current one is
+    extracted. Cards are identified by their Indeed job key; ones seen
+    before, in this run or a previous one, are skipped without extracting
+    them, and paging stops early at a page with nothing new.
+    """
 
     # Set up database
     conn, cur = setup_database()
+    seen = seen_job_keys(cur)
+    run_urls = set()
 
     jobs_data = []
-    search_url = build_indeed_search_url("Software Engineer", "Richmond, VA")
 
     with sync_playwright() as p:
         # Launch browser with realistic settings
@@ -140,41 +134,50 @@ def scrape_richmond_internships(max_pages=5, debug=False):
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
         )
 
-        page = context.new_page()
+        # Skip images, fonts, media and trackers
+        enable_fast_mode(context)
 
-        try:
-            print(f"Starting search for software engineering internships in Richmond, VA...")
-            page.goto(search_url)
-            random_sleep(2, 4)
+        tabs = [context.new_page() for _ in range(min(max_pages, prefetch + 1))]
+        loading = deque()  # (page number, tab) in page order
+        next_page = 1
 
-            # Handle potential pop-ups or cookie banners
+        def start_next(tab):
+            """Start loading the next unrequested results page in tab"""
+            nonlocal next_page
+            if next_page > max_pages:
+                return
+            search_url = build_indeed_search_url("Software Engineer internship", "Richmond, VA",
+                                                 start=(next_page - 1) * results_per_page)
             try:
-                popup_close = page.query_selector('[aria-label="close"]')
-                if popup_close:
-                    popup_close.click()
-                    random_sleep(1, 2)
-            except:
-                pass
+                paced_start(tab, search_url)
+            except Exception as e:
+                print(f"Could not start page {next_page}: {e}")
+            loading.append((next_page, tab))
+            next_page += 1
 
-            page_num = 1
+        try:
+            print(f"Starting search for software engineering internships in Richmond, VA...")
+            for tab in tabs:
+                start_next(tab)
 
-            while page_num <= max_pages:
+            while loading:
+                page_num, page = loading.popleft()
                 print(f"Scraping page {page_num}...")
 
-                # Wait for job listings to load - try multiple selectors
+                # Wait for job listings to load - any of the registry's card selectors
+                if not wait_for_cards(page, timeout=15000):
+                    print("No job cards appeared before the timeout")
+
+                # Handle potential pop-ups or cookie banners
                 try:
-                    page.wait_for_selector('[data-jk], .jobsearch-SerpJobCard, .job_seen_beacon', timeout=15000)
+                    popup_close = page.query_selector('[aria-label="close"]')
+                    if popup_close:
+                        popup_close.click()
                 except:
-                    print("Waiting for page to load completely...")
-                    random_sleep(5, 8)
-
-                random_sleep(2, 4)
+                    pass
 
                 # Get all job listing elements - try multiple selectors
-                job_elements = (page.query_selector_all('[data-jk]') or
-                               page.query_selector_all('.jobsearch-SerpJobCard') or
-                               page.query_selector_all('.job_seen_beacon') or
-                               page.query_selector_all('[data-testid="job-result"]'))
+                _, job_elements = find_cards(page)
 
                 print(f"Found {len(job_elements)} job listings on page {page_num}")
 
@@ -186,21 +189,21 @@ def scrape_richmond_internships(max_pages=5, debug=False):
                     print(f"Debug: Saved page content to {debug_filename}")
 
                 # Extract data from each job listing
+                new_on_page = 0
                 for job_element in job_elements:
-                    job_data = extract_job_data(job_element)
+                    job_key = card_job_key(job_element)
+                    if job_key in seen:
+                        continue
+                    job_data = extract_job_data(job_element, job_key)
                     if job_data and job_data['title'] != "N/A":
-                        # Check for internship keywords in multiple fields
-                        title_lower = job_data['title'].lower()
-                        snippet_lower = job_data['snippet'].lower()
-
-                        # Look for internship-related keywords
-                        internship_keywords = ['intern', 'internship', 'co-op', 'coop', 'summer program', 'student']
-                        software_keywords = ['software', 'developer', 'engineer', 'programming', 'coding', 'tech']
-
-                        is_internship = any(keyword in title_lower or keyword in snippet_lower for keyword in internship_keywords)
-                        is_software_related = any(keyword in title_lower or keyword in snippet_lower for keyword in software_keywords)
-
-                        if is_internship and is_software_related:
+                        if job_data['job_url'] in run_urls:
+                            continue  # A card without a job key that Indeed repeated
+                        run_urls.add(job_data['job_url'])
+                        if job_key:
+                            seen.add(job_key)
+                        new_on_page += 1
+
+                        if is_software_internship(job_data):
                             jobs_data.append(job_data)
                             print(f"Found internship: {job_data['title']} at {job_data['company']}")
                         elif debug:
@@ -225,25 +228,24 @@ def scrape_richmond_internships(max_pages=5, debug=False):
                         except Exception as e:
                             print(f"Database error: {e}")
 
-                # Try to go to next page
-                try:
-                    next_button = page.query_selector('a[aria-label="Next Page"]')
-                    if next_button and next_button.is_enabled():
-                        next_button.click()
-                        random_sleep(3, 5)
-                        page_num += 1
-                    else:
-                        print("No more pages available")
-                        break
-                except Exception as e:
-                    print(f"Error navigating to next page: {e}")
+                # No cards means we ran past the last page; nothing new means
+                # the rest (sorted by date) is older and already stored
+                if not job_elements:
+                    print("No more pages available")
                     break
+                if not new_on_page:
+                    print(f"Every job on page {page_num} was already seen, stopping")
+                    break
+
+                # This tab is free again: prefetch the next page in it
+                start_next(page)
 
         except Exception as e:
             print(f"Error during scraping: {e}")
 
         finally:
             browser.close()
+            registry.save_stats()
 
     # Commit database changes
     conn.commit()
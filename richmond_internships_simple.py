@@ -1,25 +1,17 @@
 from playwright.sync_api import sync_playwright
+from dom_extract import absolute_indeed_url, card_job_key, extract_field, find_cards, wait_for_cards
+from page_setup import enable_fast_mode
+from pacing import paced_goto
+from indeed_selectors import registry
+from richmond_internships_scraper import build_indeed_search_url
 import csv
 import json
-import time
-import random
 from datetime import datetime
-from urllib.parse import urlencode
-
-def random_sleep(min_seconds, max_seconds):
-    """Sleep for a random duration between min_seconds and max_seconds"""
-    time.sleep(random.uniform(min_seconds, max_seconds))
-
-def build_indeed_url():
-    """Build Indeed search URL specifically for internships in Richmond, VA"""
-    base_url = "https://www.indeed.com/jobs"
-    params = {
-        'q': 'software engineering internship',
-        'l': 'Richmond, VA',
-        'jt': 'internship',
-        'sort': 'date'
-    }
-    return f"{base_url}?{urlencode(params)}"
+
+
+def build_indeed_url(query="software engineering internship", location="Richmond, VA", job_type="internship"):
+    """Build Indeed search URL, by default for internships in Richmond, VA"""
+    return build_indeed_search_url(query, location, job_type)
 
 def scrape_internships():
     """Simple scraper for Richmond software engineering internships"""
@@ -32,42 +24,31 @@ def scrape_internships():
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
         )
 
+        # Skip images, fonts, media and trackers
+        enable_fast_mode(context)
+
         page = context.new_page()
 
         try:
             url = build_indeed_url()
             print(f"Searching: {url}")
-            page.goto(url)
-            random_sleep(3, 5)
+            paced_goto(page, url)
 
             # Close any popups
             try:
                 close_button = page.query_selector('[aria-label="close"], [aria-label="Close"]')
                 if close_button:
                     close_button.click()
-                    random_sleep(1, 2)
             except:
                 pass
 
             # Wait for results
-            page.wait_for_load_state('networkidle')
-            random_sleep(2, 4)
-
-            # Try to find job cards using various selectors
-            selectors_to_try = [
-                'div[data-jk]',
-                '.jobsearch-SerpJobCard',
-                '.job_seen_beacon',
-                '[data-testid="job-result"]',
-                '.slider_container .slider_item'
-            ]
-
-            job_elements = []
-            for selector in selectors_to_try:
-                job_elements = page.query_selector_all(selector)
-                if job_elements:
-                    print(f"Found {len(job_elements)} job elements using selector: {selector}")
-                    break
+            wait_for_cards(page)
+
+            # Try to find job cards using the shared registry's card selectors
+            selector, job_elements = find_cards(page)
+            if job_elements:
+                print(f"Found {len(job_elements)} job elements using selector: {selector}")
 
             if not job_elements:
                 # Save page content for manual inspection
@@ -79,52 +60,12 @@ def scrape_internships():
             # Extract job information
             for i, job_element in enumerate(job_elements):
                 try:
-                    # Try multiple title selectors
-                    title_selectors = ['h2 a span', 'h2 span', '.jobTitle a', '.jobTitle']
-                    title = "N/A"
-                    for sel in title_selectors:
-                        title_elem = job_element.query_selector(sel)
-                        if title_elem:
-                            title = title_elem.inner_text().strip()
-                            break
-
-                    # Try multiple company selectors
-                    company_selectors = ['[data-testid="company-name"]', '.companyName']
-                    company = "N/A"
-                    for sel in company_selectors:
-                        company_elem = job_element.query_selector(sel)
-                        if company_elem:
-                            company = company_elem.inner_text().strip()
-                            break
-
-                    # Try multiple location selectors
-                    location_selectors = ['[data-testid="job-location"]', '.companyLocation']
-                    location = "N/A"
-                    for sel in location_selectors:
-                        location_elem = job_element.query_selector(sel)
-                        if location_elem:
-                            location = location_elem.inner_text().strip()
-                            break
-
-                    # Try to find job URL
-                    url_selectors = ['h2 a', '.jobTitle a', 'a']
-                    job_url = "N/A"
-                    for sel in url_selectors:
-                        link_elem = job_element.query_selector(sel)
-                        if link_elem:
-                            href = link_elem.get_attribute('href')
-                            if href:
-                                job_url = f"https://www.indeed.com{href}" if href.startswith('/') else href
-                                break
-
-                    # Try to find job description/snippet
-                    snippet_selectors = ['[data-testid="job-snippet"]', '.summary']
-                    snippet = "N/A"
-                    for sel in snippet_selectors:
-                        snippet_elem = job_element.query_selector(sel)
-                        if snippet_elem:
-                            snippet = snippet_elem.inner_text().strip()
-                            break
+                    # Each field tries the shared registry's fallback selectors
+                    title = extract_field(job_element, 'title') or "N/A"
+                    company = extract_field(job_element, 'company') or "N/A"
+                    location = extract_field(job_element, 'location') or "N/A"
+                    job_url = absolute_indeed_url(extract_field(job_element, 'job_url'), card_job_key(job_element))
+                    snippet = extract_field(job_element, 'snippet') or "N/A"
 
                     job_data = {
                         'title': title,
@@ -146,6 +87,7 @@ def scrape_internships():
 
         finally:
             browser.close()
+            registry.save_stats()
 
     # Save results
     if jobs_data:
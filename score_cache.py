@@ -0,0 +1,127 @@
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+
+def normalize_description(text):
+    """
+    Collapse whitespace so re-scraped copies of a posting hash the same
+    """
+    return " ".join(text.split())
+
+
+def score_key(model, template_id, resume, job_description):
+    """
+    Content address of one scoring call: a hash of everything that decides the
+    answer. template_id names the prompt and its version, e.g. "job_scoring/3",
+    so different prompts never share answers.
+    """
+    parts = [model, template_id, resume, normalize_description(job_description)]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def parse_tag(text, tag):
+    match = re.search(rf"<{tag}>\s*(.*?)\s*</{tag}>", text, re.S)
+    return match.group(1) if match else None
+
+
+class ScoreCache:
+    """
+    Persistent cache of resume x job Match Scores, keyed by score_key.
+    Entries older than ttl seconds are ignored and dropped; least recently
+    used entries are evicted once the stored answers exceed max_bytes.
+    """
+    def __init__(self, path="score_cache.db", ttl=30 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                score TEXT,
+                justification TEXT,
+                answer TEXT,
+                size INTEGER,
+                created REAL,
+                last_access REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_last_access ON scores (last_access)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM scores").fetchone()[0]
+
+    def get(self, key):
+        """
+        Return the cached answer text for key, or None if missing or expired
+        """
+        row = self.conn.execute("SELECT answer, created FROM scores WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                self._delete(key)
+                self.conn.commit()
+            self.misses += 1
+            return None
+        self.conn.execute("UPDATE scores SET last_access = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def score(self, key):
+        """
+        Return (score, justification) for key without the rest of the answer, or None
+        """
+        answer = self.get(key)
+        if answer is None:
+            return None
+        return parse_tag(answer, "match_score"), parse_tag(answer, "justification")
+
+    def put(self, key, model, answer):
+        now = time.time()
+        size = len(answer.encode("utf-8"))
+        self._delete(key)
+        self.conn.execute(
+            "INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, model, parse_tag(answer, "match_score"), parse_tag(answer, "justification"), answer, size, now, now))
+        self.total_bytes += size
+        self._evict()
+        self.conn.commit()
+
+    def _delete(self, key):
+        row = self.conn.execute("SELECT size FROM scores WHERE key = ?", (key,)).fetchone()
+        if row:
+            self.total_bytes -= row[0]
+            self.conn.execute("DELETE FROM scores WHERE key = ?", (key,))
+
+    def _evict(self):
+        self.conn.execute("DELETE FROM scores WHERE created < ?", (time.time() - self.ttl,))
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM scores").fetchone()[0]
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute("SELECT key, size FROM scores ORDER BY last_access LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self.conn.execute("DELETE FROM scores WHERE key = ?", (key,))
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def close(self):
+        self.conn.close()
+
+
+_default_cache = None
+
+def default_cache():
+    """
+    The shared ScoreCache in score_cache.db, opened on first use
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ScoreCache()
+    return _default_cache
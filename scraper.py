@@ -1,11 +1,13 @@
 
-import requests
-from bs4 import BeautifulSoup
+from html_parsers import make_soup
+from http_cache import HttpCache
 
 first_test_url = "https://en.wikipedia.org/wiki/Web_scraping"
+http_cache = HttpCache()
 
 def extract_paragraph(url):
-    response = requests.get(url)
+    # Conditional GET: unchanged pages come back as a 304 and are read from disk
+    response = http_cache.get(url)
 
 
     ### Docs for Requst library
@@ -30,7 +32,7 @@ def extract_paragraph(url):
     #print("JSON", first_request.json())
 
     # just html text
-    html_soup = BeautifulSoup(raw_text, features="html.parser")
+    html_soup = make_soup(raw_text)
     print(html_soup)
 
     # Extract text
@@ -1,7 +1,15 @@
 # Imports
-from playwright_practice import *
 from claude_example import *
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+from page_setup import enable_fast_mode_async, goto_ready_async
+from playwright_practice import cl_result_selector
+from pacing import RateLimiter
+from job_payloads import ResponseCapture, craigslist_records_from_text, first_records
+from job_scoring import AsyncScorer, FakeAsyncClient, parse_match_score, score_model, score_request, score_template_id, usage_record
+from score_cache import default_cache, score_key
+from batch_scoring import FakeBatchClient, score_jobs_table_batch
+from job_prefilter import prefiltered, select_for_scoring
+import asyncio
 import sqlite3
 import tldextract
 
@@ -25,55 +33,14 @@ def get_link_source(url):
     return site_name.capitalize()
     
 def get_compatability_score(resume, job_description):
-    score = client.messages.create(
-        model="claude-opus-4-20250514",
-        max_tokens=1000,
-        temperature=1,
-        system="You are a world-class Job Analyst. You can see the jobs and people behind the resumes, and can understand whether or not a given job and person would be a good match.",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                    "text": f"""
-                        You are an AI assistant tasked with creating a "Match Score" between a user's description of their resume and a job posting. Your goal is to analyze both inputs and determine how well the candidate's qualifications align with the job requirements.
-
-                        First, carefully read the following resume description:
-
-                        <resume_description>
-                        {resume}
-                        </resume_description>
-
-                        Now, read the job posting:
-
-                        <job_posting>
-                        {job_description}
-                        </job_posting>
-
-                        To create an accurate Match Score, follow these steps:
-
-                        1. Analyze the job posting to identify key requirements, skills, and qualifications.
-                        2. Compare these requirements to the information provided in the resume description.
-                        3. Consider both hard skills (technical abilities, certifications, etc.) and soft skills (communication, teamwork, etc.) mentioned in both the resume and job posting.
-                        4. Evaluate the level of experience required in the job posting and compare it to the candidate's experience level.
-                        5. Look for any specific achievements or accomplishments in the resume that directly relate to the job requirements.
-
-                        Before providing your final Match Score, use the <scratchpad> tags to think through your analysis and comparison. Consider the strengths and weaknesses of the match, and any areas where the candidate exceeds or falls short of the job requirements.
-
-                        Finally, provide a numerical Match Score as a percentage, where 100% represents a perfect match and 0% represents no match at all. Consider all aspects of your analysis when determining this score. Present your Match Score within <match_score> tags.
-
-                        <match_score>
-                        [Your Match Score here]
-                        </match_score>
-
-                        Remember to be objective and thorough in your analysis, considering all aspects of both the resume description and job posting when determining the Match Score.
-                    """
-                    }
-                ]
-            }
-        ]
-    )
+    """Blocking single score; create_job_table scores with job_scoring.AsyncScorer"""
+    key = score_key(score_model, score_template_id, resume, job_description)
+    cached = default_cache().get(key)
+    if cached is not None:
+        return cached
+    score = client.messages.create(**score_request(resume, job_description))
+    print("Token usage:", usage_record(score))
+    default_cache().put(key, score_model, score.content[0].text)
     return score.content[0].text
 
 # Generate job table
@@ -84,7 +51,77 @@ def get_compatability_score(resume, job_description):
 ## Url
 ## Compatability *
 
-def create_job_table():
+async def get_listings(page):
+    """Return (title, url) for every search result on the page in one round trip"""
+    return await page.eval_on_selector_all(
+        cl_result_selector,
+        """els => els.map(el => {
+            const link = el.querySelector('a');
+            return [el.getAttribute('title'), (link && link.getAttribute('href')) || 'none listed'];
+        })"""
+    )
+
+async def fetch_job_descriptions(pages, listings, rate=4.0):
+    """Fetch the #postingbody of every listing with a pool of reusable pages,
+    one worker per page. Yields (title, url, description) as each one finishes.
+    `rate` caps listing loads per second across the whole pool."""
+    limiter = RateLimiter(rate=rate, burst=len(pages))
+    todo = asyncio.Queue()
+    for listing in listings:
+        todo.put_nowait(listing)
+    done = asyncio.Queue()
+
+    async def worker(job_page):
+        while not todo.empty():
+            title, webAddress = todo.get_nowait()
+            description = "No description found"
+            try:
+                await limiter.wait_async(webAddress)
+                await goto_ready_async(job_page, webAddress, timeout=10000)
+                desc_el = await job_page.wait_for_selector("#postingbody", timeout=5000)
+                if desc_el:
+                    description = (await desc_el.inner_text()).strip()
+            except Exception as e:
+                print(f"Could not load {webAddress}: {e}")
+            await done.put((title, webAddress, description))
+
+    workers = [asyncio.create_task(worker(job_page)) for job_page in pages]
+    for _ in range(len(listings)):
+        yield await done.get()
+    await asyncio.gather(*workers)
+
+def posting_details(record):
+    """One line of the ld+json posting fields the result cards don't show"""
+    labels = [('company', 'Company'), ('location', 'Location'), ('employment_type', 'Type'), ('salary', 'Pay')]
+    return " | ".join(f"{label}: {record[key]}" for key, label in labels if record.get(key))
+
+async def score_and_store(scorer, cur, source, title, webAddress, description, compatability=None):
+    """Score one listing and insert it; runs as its own task so the page pool
+    keeps fetching while requests are in flight. With no scorer the row is
+    stored with the given compatability, None leaving it for batch scoring."""
+    if scorer and description != "No description found":
+        try:
+            answer = await scorer.score(resume, description)
+            compatability = parse_match_score(answer) or answer
+            print(f"{title}: {compatability}")
+        except Exception as e:
+            print(f"Could not score {webAddress}: {e}")
+    cur.execute("INSERT INTO jobs (source, job, description, url, compatability) VALUES (?, ?, ?, ?, ?)", (source, title, description, webAddress, compatability))
+
+async def create_job_table_async(pool_size=8, capture_payloads=False, scorer=None, score=True,
+                                 top_k=None, min_relevance=None):
+    """Scrape the listings and score them against the resume. scorer defaults
+    to an AsyncScorer on the real API with the shared score cache;
+    AsyncScorer(FakeAsyncClient()) runs offline. score=False leaves the
+    scores empty for batch_scoring. top_k/min_relevance rank every
+    description against the resume first (job_prefilter) and only score
+    the ones that make the cut; the rest are stored as job_prefilter.prefiltered
+    so batch runs don't score them either."""
+    prefilter = top_k is not None or min_relevance is not None
+    if score:
+        scorer = scorer or AsyncScorer(cache=default_cache())
+    else:
+        scorer = None
     print("Paste the link to the job source: \n")
     # https://richmond.craigslist.org/search/richmond-va/sof?lat=37.551&lon=-77.459&search_distance=25#search=2~thumb~0
     link = "https://richmond.craigslist.org/search/richmond-va/sof?lat=37.551&lon=-77.459&search_distance=25#search=2~thumb~0"#input()
@@ -108,44 +145,88 @@ def create_job_table():
     conn.commit()
 
 
-    with sync_playwright() as p:
+    async with async_playwright() as p:
         #### Initialize our Browser
-        browser = p.chromium.launch(headless=True)  # Launch headless browser
-        context = browser.new_context()
-        ### Visit a seed web page
-            ### Input -- A website to visit, a configured browser object
-            ### Output -- Playwright Page Object
-        pageData = visit_seed_web_page(link, browser)
-
-        ### Grab all elements that may contain search results from that page
-        pageLinks = get_all_link_elements_from_page(pageData)
-
-        ### Find the Title and Web Addresses from those results
-        for data in pageLinks:
-            title = get_job_title_from_CL_html(data)
-            webAddress = get_web_address_for_link_element(data)
-            #print("title ", title)
-            #print("web address ", webAddress, "\n")
-            
-            # Open the individual job listing
-            job_page = context.new_page()
-            try:
-                job_page.goto(webAddress, timeout=10000)
-                job_page.wait_for_selector("#postingbody", timeout=5000)
-                desc_el = job_page.query_selector("#postingbody")
-                description = desc_el.inner_text().strip() if desc_el else "No description found"
-                print(get_compatability_score(resume, description))
-            except:
-                pass
-            finally:
-                job_page.close()
-            
-            cur.execute("INSERT INTO jobs (source, job, description, url, compatability) VALUES (?, ?, ?, ?, ?)", (source, title, description, webAddress, "compatability_score"))
+        browser = await p.chromium.launch(headless=True)  # Launch headless browser
+        context = await browser.new_context()
+        await enable_fast_mode_async(context)  # Skip images, fonts, media and trackers
+
+        ### Visit a seed web page and grab the title + web address of every result
+        seed_page = await context.new_page()
+        capture = ResponseCapture(hosts=["craigslist.org"]).attach(seed_page) if capture_payloads else None
+        await goto_ready_async(seed_page, link, cl_result_selector)
+        listings = await get_listings(seed_page)
+        print("number of links found on page", len(listings))
+
+        ### The search page's ld+json postings are in result order but carry no URL,
+        ### so they only add to the listings when the counts line up
+        details = {}
+        if capture:
+            records = first_records(await capture.texts_async(), craigslist_records_from_text)
+            if len(records) == len(listings):
+                details = {webAddress: posting_details(record) for (_, webAddress), record in zip(listings, records)}
+            else:
+                print(f"{len(records)} postings in the page data for {len(listings)} listings, skipping them")
+
+        ### Pre-open a pool of pages and reuse them for every listing
+        pages = [seed_page] + [await context.new_page() for _ in range(pool_size - 1)]
+
+        if scorer:
+            await scorer.check_cache_prefix(resume)
+        scoring = []
+        fetched = []
+        async for title, webAddress, description in fetch_job_descriptions(pages, listings):
+            if details.get(webAddress) and description != "No description found":
+                description = f"{details[webAddress]}\n\n{description}"
+            if prefilter:
+                fetched.append((title, webAddress, description))  # Ranked once everything is in
+            else:
+                scoring.append(asyncio.create_task(score_and_store(scorer, cur, source, title, webAddress, description)))
+
+        if prefilter:
+            found = [i for i, (_, _, description) in enumerate(fetched) if description != "No description found"]
+            selected, _ = select_for_scoring(resume, [fetched[i][2] for i in found], top_k, min_relevance)
+            keep = {found[i] for i in selected}
+            print(f"Pre-filter kept {len(keep)} of {len(fetched)} listings for scoring")
+            for i, (title, webAddress, description) in enumerate(fetched):
+                if i in keep or description == "No description found":
+                    task = score_and_store(scorer, cur, source, title, webAddress, description)
+                else:
+                    task = score_and_store(None, cur, source, title, webAddress, description, prefiltered)
+                scoring.append(asyncio.create_task(task))
+        await asyncio.gather(*scoring)
+        if scorer:
+            print("Scoring token usage:", scorer.usage_summary())
 
         conn.commit()
         conn.close()
-        browser.close()
+        await browser.close()
+
+def create_job_table(pool_size=8, capture_payloads=False, fake_scoring=False, batch=False,
+                     top_k=None, min_relevance=None):
+    """batch=True scrapes everything first, then scores it in one Message
+    Batch at batch pricing instead of live requests. In batch mode the
+    pre-filter runs once, in score_jobs_table_batch, over every unscored
+    listing; ranking a subset again would drop listings the first pass kept."""
+    scorer = AsyncScorer(FakeAsyncClient()) if fake_scoring else None
+    if batch:
+        asyncio.run(create_job_table_async(pool_size, capture_payloads, scorer, score=False))
+    else:
+        asyncio.run(create_job_table_async(pool_size, capture_payloads, scorer, True, top_k, min_relevance))
+
+    if batch:
+        conn = sqlite3.connect("craigslist_jobs.db")
+        if fake_scoring:
+            score_jobs_table_batch(conn, resume, client=FakeBatchClient(), poll_interval=0,
+                                   top_k=top_k, min_relevance=min_relevance)
+        else:
+            score_jobs_table_batch(conn, resume, cache=default_cache(), top_k=top_k, min_relevance=min_relevance)
+        conn.close()
 
 
 if __name__ == "__main__":
-    create_job_table()
\ No newline at end of file
+    import sys
+    top_k = int(sys.argv[sys.argv.index("--top-k") + 1]) if "--top-k" in sys.argv else None
+    min_relevance = float(sys.argv[sys.argv.index("--min-relevance") + 1]) if "--min-relevance" in sys.argv else None
+    create_job_table(fake_scoring="--fake-scoring" in sys.argv, batch="--batch" in sys.argv,
+                     top_k=top_k, min_relevance=min_relevance)
@@ -0,0 +1,77 @@
+from job_payloads import craigslist_records_from_text, first_records, indeed_records_from_text
+
+# Trimmed-down copies of the two payloads; none of the saved pages carries one
+indeed_page = """<script>
+window.mosaic.providerData["mosaic-provider-jobcards"]={"metaData":{"mosaicProviderJobCardsModel":{"results":[
+ {"jobkey":"abc123","displayTitle":"Software Engineering Intern","company":"Acme",
+  "formattedLocation":"Richmond, VA","salarySnippet":{"text":"$20 an hour"},
+  "snippet":"<ul><li>Write &amp; test code</li></ul>","formattedRelativeTime":"2 days ago",
+  "link":"/rc/clk?jk=abc123","jobTypes":["Internship"],"pubDate":1700000000000},
+ {"jobkey":"def456","title":"Data Intern","truncatedCompany":"Beta Corp","formattedLocation":"Remote",
+  "estimatedSalary":{"formattedRange":"$18 - $22 an hour"},"remoteLocation":true}
+]}}};
+window.mosaic.providerData["mosaic-provider-rich-media"]={};
+</script>"""
+
+craigslist_page = """<script type="application/ld+json" id="ld_searchpage_results">
+{"@context":"https://schema.org","@type":"ItemList","itemListElement":[
+ {"@type":"ListItem","position":"1","item":{"@type":"JobPosting","title":"Line Cook",
+  "hiringOrganization":{"@type":"Organization","name":"Diner"},"employmentType":["PART_TIME"],
+  "jobLocation":{"@type":"Place","address":{"addressLocality":"Henrico","addressRegion":"VA"}}}},
+ {"@type":"ListItem","position":"0","item":{"@type":"JobPosting","title":"Junior Developer",
+  "hiringOrganization":{"@type":"Organization","name":"Startup"},"employmentType":["FULL_TIME","CONTRACT"],
+  "datePosted":"2025-10-30T09:00:00-0400","baseSalary":{"@type":"MonetaryAmount","value":"$25/hr"},
+  "jobLocation":[{"@type":"Place","address":{"addressLocality":"Richmond","addressRegion":"VA"}}]}}
+]}
+</script>"""
+
+
+def test_indeed_mosaic_payload():
+    first, second = indeed_records_from_text(indeed_page)
+    assert first['title'] == "Software Engineering Intern"
+    assert first['company'] == "Acme"
+    assert first['location'] == "Richmond, VA"
+    assert first['salary'] == "$20 an hour"
+    assert first['job_key'] == "abc123"
+    assert first['job_url'] == "/rc/clk?jk=abc123"
+    assert first['snippet'] == "Write & test code"
+    assert first['posting_date'] == "2 days ago"
+    assert first['job_types'] == "Internship"
+    assert first['remote'] is False
+    assert first['posted'] == 1700000000000
+
+
+def test_indeed_fallback_fields():
+    _, second = indeed_records_from_text(indeed_page)
+    assert second['title'] == "Data Intern"
+    assert second['company'] == "Beta Corp"
+    assert second['salary'] == "$18 - $22 an hour"
+    assert second['job_url'] == "/viewjob?jk=def456"
+    assert second['remote'] is True
+
+
+def test_indeed_json_response_body():
+    body = indeed_page.split("=", 1)[1].split(";\n", 1)[0]
+    assert [record['job_key'] for record in indeed_records_from_text(body)] == ["abc123", "def456"]
+
+
+def test_indeed_page_without_payload():
+    assert indeed_records_from_text("<html><body>No results</body></html>") == []
+
+
+def test_craigslist_item_list_in_position_order():
+    first, second = craigslist_records_from_text(craigslist_page)
+    assert first['title'] == "Junior Developer"
+    assert first['company'] == "Startup"
+    assert first['location'] == "Richmond, VA"
+    assert first['salary'] == "$25/hr"
+    assert first['employment_type'] == "FULL_TIME, CONTRACT"
+    assert first['posted'] == "2025-10-30T09:00:00-0400"
+    assert second['title'] == "Line Cook"
+    assert second['location'] == "Henrico, VA"
+    assert second['salary'] is None
+
+
+def test_first_records_skips_texts_without_a_payload():
+    records = first_records(["<html></html>", craigslist_page], craigslist_records_from_text)
+    assert [record['title'] for record in records] == ["Junior Developer", "Line Cook"]
@@ -1,18 +1,60 @@
-import sqlite3
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from html_parsers import article_urls, make_soup, parse_wiki_html
+from http_cache import HttpCache
+from wiki_db import ArticleWriter, connect, migrate_category_strings, setup_articles, setup_categories, setup_links
+from wiki_frontier import Frontier, SqliteFrontier, normalize_url
 
-def get_url_info(url):
+class WikiPage:
+    """
+    One article fetched and parsed once: title, categories and outbound
+    article links, passed through the pipeline instead of the raw soup
+    """
+    def __init__(self, url, title, categories, links, headers=None):
+        self.url = url
+        self.title = title
+        self.categories = categories
+        self.links = links
+        self.headers = headers
+
+    @classmethod
+    def from_soup(cls, url, soup, headers=None):
+        heading = soup.find("h1", id="firstHeading")
+        title = heading.text.strip() if heading else None
+        return cls(url, title, id_categories(soup), get_article_links(soup, count=None), headers)
+
+    @classmethod
+    def from_html(cls, url, text, headers=None, backend=None):
+        title, categories, links = parse_wiki_html(text, backend)
+        return cls(url, title, categories, links, headers)
+
+    def first_links(self, count=4):
+        return self.links[:count]
+
+def get_url_info(url, cache=None):
     """
     Returns headers, text, soup, title
     """
-    response = requests.get(url)
+    response = cache.get(url) if cache else requests.get(url)
     headers = response.headers['content-type']
     text = response.text
-    soup = BeautifulSoup(text, features="html.parser")
+    soup = make_soup(text)
     title = soup.find("h1", id="firstHeading").text.strip()
     return headers, text, soup, title
 
+def fetch_wiki_page(url, cache=None):
+    """
+    Fetch and parse url once, returning a WikiPage
+    """
+    response = cache.get(url) if cache else requests.get(url)
+    return WikiPage.from_html(url, response.text, response.headers['content-type'])
+
 def id_categories(soup):
     """
     Return categories of article
@@ -24,70 +66,234 @@ def id_categories(soup):
             categories.append(li.text.strip())
     return categories
 
-# Get following urls
-def get_first_article_links(url, count=4):
-    base_url = "https://en.wikipedia.org"
-    _,_,soup,_ = get_url_info(url)
+def get_article_links(soup, count=4):
+    """
+    Return the first `count` article urls linked from the page body
+    (all of them if count is None)
+    """
     content_div = soup.find("div", id="mw-content-text")
-    
-    urls = []
-    if content_div:
-        for link in content_div.find_all("a", href=True):
-            href = link["href"]
-            if href.startswith("/wiki/") and not ":" in href:  # Skip special pages like "Category:", "Help:", etc.
-                full_url = base_url + href
-                if full_url not in urls:
-                    urls.append(full_url)
-                if len(urls) >= count:
-                    break
-    return urls
+    if not content_div:
+        return []
+    return article_urls((link["href"] for link in content_div.find_all("a", href=True)), count)
+
+# Get following urls
+def get_first_article_links(url, count=4, page=None, cache=None):
+    """
+    Return the first `count` article links of url. Pass an already fetched
+    WikiPage as `page` to skip downloading it again.
+    """
+    if page is None:
+        page = fetch_wiki_page(url, cache)
+    return page.first_links(count)
+
+
+class HostBudget:
+    """
+    Per-host politeness: caps in-flight requests to a host and spaces
+    out request starts by at least `min_interval` seconds
+    """
+    def __init__(self, per_host=2, min_interval=0.0):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    async def acquire(self, host):
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+            self._locks[host] = asyncio.Lock()
+        await self._semaphores[host].acquire()
+        async with self._locks[host]:
+            wait = self._last_start.get(host, 0.0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start[host] = time.monotonic()
+
+    def release(self, host):
+        self._semaphores[host].release()
+
+
+async def fetch_page(client, budget, url, cache=None):
+    """
+    Fetch one url through the shared client, respecting the host budget.
+    With an HttpCache the request is conditional and a 304 is served from
+    disk. Returns the final url after redirects and the page text.
+    """
+    host = urlsplit(url).netloc
+    headers = cache.conditional_headers(url) if cache else {}
+    await budget.acquire(host)
+    try:
+        response = await client.get(url, headers=headers)
+    finally:
+        budget.release(host)
+    if response.status_code == 304:
+        cached = cache.lookup(url)
+        if cached is not None:
+            return cached.url, cached.text
+        if headers:
+            # lookup dropped the stale entry, so this retry is unconditional
+            return await fetch_page(client, budget, url, cache=cache)
+    response.raise_for_status()
+    if cache:
+        cache.store(url, response.text, response.headers, str(response.url))
+    return str(response.url), response.text
+
+
+async def crawl(seed_url, on_article, max_articles=100, concurrency=8, per_host=4, min_interval=0.0, link_count=4, frontier=None, cache=None, parse_workers=None, parser_backend=None):
+    """
+    Breadth-first crawl from seed_url with `concurrency` fetchers sharing one
+    connection pool. on_article(page) is called with the WikiPage built for
+    every url fetched; if it returns False the page's links are not followed.
+    Every url is fetched at most once per frontier; pass a SqliteFrontier to
+    make the crawl resumable, and an HttpCache to revalidate instead of
+    re-downloading unchanged pages.
+
+    Fetchers put raw HTML on a bounded queue and `parse_workers` parser
+    tasks hand it to a ProcessPoolExecutor, so parsing overlaps the next
+    downloads and uses every core (default: one process per cpu; 0 parses
+    in the event loop instead).
+    """
+    if frontier is None:
+        frontier = Frontier()
+    frontier.add(seed_url)
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    budget = HostBudget(per_host, min_interval)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    ready = asyncio.Condition()
+    html_queue = asyncio.Queue(maxsize=2 * max(parse_workers, 1))
+    parse = functools.partial(parse_wiki_html, backend=parser_backend)
+    loop = asyncio.get_running_loop()
+    started = 0
+    in_flight = 0
+
+    async def next_url():
+        nonlocal started, in_flight
+        async with ready:
+            while True:
+                if started >= max_articles:
+                    return None
+                url = frontier.pop()
+                if url is not None:
+                    started += 1
+                    in_flight += 1
+                    return url
+                if in_flight == 0:
+                    return None
+                await ready.wait()
+
+    async def finish(links):
+        nonlocal in_flight
+        async with ready:
+            for link in links:
+                frontier.add(link)
+            in_flight -= 1
+            ready.notify_all()
+
+    async def fetcher(client):
+        while True:
+            url = await next_url()
+            if url is None:
+                return
+            print(f"Processing URL: {url}")
+            try:
+                final_url, text = await fetch_page(client, budget, url, cache)
+            except httpx.HTTPError as e:
+                print(f"Failed to fetch {url}: {e}")
+                frontier.mark_failed(url)
+                await finish([])
+                continue
+            final_url = normalize_url(final_url)
+            # A redirect to an article we already queued is a duplicate
+            if final_url != url and not frontier.mark_seen(final_url):
+                frontier.mark_done(url)
+                await finish([])
+                continue
+            await html_queue.put((url, final_url, text))
+
+    async def parser(pool):
+        while True:
+            item = await html_queue.get()
+            if item is None:
+                return
+            url, final_url, text = item
+            links = []
+            try:
+                if pool is None:
+                    title, categories, all_links = parse(text)
+                else:
+                    title, categories, all_links = await loop.run_in_executor(pool, parse, text)
+                page = WikiPage(final_url, title, categories, all_links)
+                if page.title is not None and on_article(page) is not False:
+                    links = page.first_links(link_count)
+                frontier.mark_done(url)
+                if final_url != url:
+                    frontier.mark_done(final_url)  # The redirect target mark_seen left in flight
+            except Exception as e:
+                # One bad page or callback shouldn't take the rest of the crawl down with it
+                print(f"Failed to process {url}: {e}")
+                links = []
+                frontier.mark_failed(url)
+                if final_url != url:
+                    frontier.mark_failed(final_url)
+            finally:
+                await finish(links)
+
+    async def run(pool):
+        async def fetch_all(client):
+            await asyncio.gather(*(fetcher(client) for _ in range(concurrency)))
+            for _ in range(max(parse_workers, 1)):
+                await html_queue.put(None)
+
+        async with httpx.AsyncClient(limits=limits, follow_redirects=True) as client:
+            tasks = [asyncio.ensure_future(fetch_all(client))]
+            tasks += [asyncio.ensure_future(parser(pool)) for _ in range(max(parse_workers, 1))]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+    if parse_workers == 0:
+        await run(None)
+    else:
+        with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+            await run(pool)
+    return started
 
 
 
 # Name == main
 if __name__ == "__main__":
     # Create database
-    conn = sqlite3.connect("wikipedia_articles.db")
-    cur = conn.cursor()
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS articles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            categories TEXT,
-            url TEXT
-        )
-    """)
-    conn.commit()
+    conn = connect("wikipedia_articles.db")
+    setup_articles(conn)
+    setup_categories(conn)
+    setup_links(conn)
+    migrated = migrate_category_strings(conn)
+    if migrated:
+        print(f"Migrated categories of {migrated} articles")
 
 
     first_test_url = "https://en.wikipedia.org/wiki/Web_scraping"
-    urls = [first_test_url]
-    urls.extend(get_first_article_links(first_test_url)) 
-
-    # Add to database
-    #for url in urls:
-    total_urls_processed = 0
-    while (len(urls) > 0) and (total_urls_processed < 100):
-        total_urls_processed
-        url = urls.pop(0)
-        print(f"Processing URL: {url}")
-        print(f"Total URLs processed: {total_urls_processed}")
-        print(f"URLs remaining: {len(urls)}")
-        #  headers, text, soup, title <-- Add to Function Signature 
-        _, _, souper, title = get_url_info(url)
-        categories = id_categories(souper)
-        category_string = ", ".join(categories)
-        try:
-            cur.execute("INSERT INTO articles (title, categories, url) VALUES (?, ?, ?)", (title, category_string, url))
-            urls.extend(get_first_article_links(url))
-        except:
-            continue
-
-
-        
-    
-
-
-    conn.commit()
+
+    # Add to database in batches; each flush also commits the frontier, so a
+    # crash loses at most one batch and those urls are fetched again on resume
+    writer = ArticleWriter(conn, batch_size=50)
+
+    def save_article(page):
+        writer.add(page.title, page.categories, page.url, page.links)
+
+    # Resumes from the frontier table if a previous run was interrupted
+    frontier = SqliteFrontier(conn, commit_every=None)
+    cache = HttpCache()
+    total_urls_processed = asyncio.run(crawl(first_test_url, save_article, max_articles=100, frontier=frontier, cache=cache))
+    writer.close()
+    print(f"Total URLs processed: {total_urls_processed}")
+    print(f"Articles written: {writer.written}, skipped: {writer.skipped}")
+    print(f"Frontier: {frontier.counts()}")
+
+
     conn.close()
@@ -0,0 +1,258 @@
+import sqlite3
+
+
+def connect(path="wikipedia_articles.db"):
+    """
+    Open the articles database tuned for bulk writes: WAL journal so readers
+    don't block the writer, synchronous=NORMAL (safe with WAL, one fsync per
+    checkpoint instead of per commit) and a 64 MB page cache
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -64000")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def setup_articles(conn):
+    """
+    Create the articles table and a UNIQUE index on url, dropping any
+    duplicate urls left by older crawls first
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            categories TEXT,
+            url TEXT
+        )
+    """)
+    conn.execute("""
+        DELETE FROM articles
+        WHERE url IS NOT NULL
+          AND id NOT IN (SELECT MIN(id) FROM articles GROUP BY url)
+    """)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_url ON articles (url)")
+    conn.commit()
+
+
+def setup_categories(conn):
+    """
+    Create the normalized categories and article_categories tables. The
+    join table is keyed (article_id, category_id) with a reverse index, so
+    both "categories of an article" and "articles in a category" are
+    index lookups.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS article_categories (
+            article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+            category_id INTEGER NOT NULL REFERENCES categories (id),
+            PRIMARY KEY (article_id, category_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_article_categories_category ON article_categories (category_id, article_id)")
+    conn.commit()
+
+
+def category_ids(conn, names):
+    """
+    Return {name: id}, creating categories that don't exist yet
+    """
+    conn.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)", [(name,) for name in names])
+    return {name: conn.execute("SELECT id FROM categories WHERE name = ?", (name,)).fetchone()[0] for name in names}
+
+
+def set_article_categories(conn, article_id, names, ids):
+    conn.execute("DELETE FROM article_categories WHERE article_id = ?", (article_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO article_categories (article_id, category_id) VALUES (?, ?)",
+        [(article_id, ids[name]) for name in names],
+    )
+
+
+def migrate_category_strings(conn):
+    """
+    Fill article_categories from the comma-joined articles.categories
+    column for articles that have no join rows yet. Returns the number of
+    articles migrated. Category names that themselves contain ", " can't be
+    told apart in the old string and are split; new crawls write the join
+    table directly and don't have this problem.
+    """
+    rows = conn.execute("""
+        SELECT id, categories FROM articles
+        WHERE categories IS NOT NULL AND categories != ''
+          AND id NOT IN (SELECT DISTINCT article_id FROM article_categories)
+    """).fetchall()
+    parsed = [(article_id, [name for name in text.split(", ") if name]) for article_id, text in rows]
+    ids = category_ids(conn, {name for _, names in parsed for name in names})
+    for article_id, names in parsed:
+        set_article_categories(conn, article_id, names, ids)
+    conn.commit()
+    return len(parsed)
+
+
+def articles_in_category(conn, name):
+    """
+    Return (id, title, url) of every article in category `name`
+    """
+    return conn.execute("""
+        SELECT a.id, a.title, a.url
+        FROM categories c
+        JOIN article_categories ac ON ac.category_id = c.id
+        JOIN articles a ON a.id = ac.article_id
+        WHERE c.name = ?
+        ORDER BY a.id
+    """, (name,)).fetchall()
+
+
+def categories_of(conn, article_id):
+    """
+    Return the category names of one article
+    """
+    return [name for (name,) in conn.execute("""
+        SELECT c.name FROM article_categories ac
+        JOIN categories c ON c.id = ac.category_id
+        WHERE ac.article_id = ?
+        ORDER BY c.name
+    """, (article_id,))]
+
+
+def top_categories(conn, limit=20):
+    """
+    Return (name, article count) for the largest categories
+    """
+    return conn.execute("""
+        SELECT c.name, COUNT(*) AS n FROM article_categories ac
+        JOIN categories c ON c.id = ac.category_id
+        GROUP BY ac.category_id
+        ORDER BY n DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+
+
+def setup_links(conn):
+    """
+    Create the link graph tables. pages gives every url seen (crawled or
+    only linked to) a compact integer id; links holds one (source_id,
+    target_id) row per edge, clustered by source with a reverse index on
+    target for in-degree queries.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT UNIQUE NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS links (
+            source_id INTEGER NOT NULL,
+            target_id INTEGER NOT NULL,
+            PRIMARY KEY (source_id, target_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_links_target ON links (target_id, source_id)")
+    conn.commit()
+
+
+def page_ids(conn, urls):
+    """
+    Return {url: page id}, adding pages for urls not seen before
+    """
+    conn.executemany("INSERT OR IGNORE INTO pages (url) VALUES (?)", [(url,) for url in urls])
+    return {url: conn.execute("SELECT id FROM pages WHERE url = ?", (url,)).fetchone()[0] for url in urls}
+
+
+def set_page_links(conn, source_id, target_ids):
+    conn.execute("DELETE FROM links WHERE source_id = ?", (source_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO links (source_id, target_id) VALUES (?, ?)",
+        [(source_id, target_id) for target_id in target_ids if target_id != source_id],
+    )
+
+
+class ArticleWriter:
+    """
+    Buffers article rows and writes them with executemany, one transaction
+    per batch_size rows. Each flush commits the connection, so a crash loses
+    at most the rows still in the buffer. Rows are upserted on url and
+    their categories written to the article_categories join table (the
+    comma-joined categories column is still filled for older readers).
+    Outbound links passed to add() are stored as edges in the links table.
+    """
+    upsert_sql = """
+        INSERT INTO articles (title, categories, url) VALUES (?, ?, ?)
+        ON CONFLICT (url) DO UPDATE SET title = excluded.title, categories = excluded.categories
+    """
+
+    def __init__(self, conn, batch_size=100):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+        self.skipped = 0
+
+    def add(self, title, categories, url, links=None):
+        self.rows.append((title, list(categories), url, links))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write and commit the buffered rows
+        """
+        rows, self.rows = self.rows, []
+        if rows:
+            self.conn.execute("SAVEPOINT article_batch")
+            try:
+                self.conn.executemany(self.upsert_sql, [self._article_row(row) for row in rows])
+                self._write_categories(rows)
+                self._write_links(rows)
+                self.conn.execute("RELEASE article_batch")
+                self.written += len(rows)
+            except sqlite3.IntegrityError:
+                # Another constraint (e.g. UNIQUE title on older databases) hit
+                # one row; retry the batch row by row and report the bad ones
+                self.conn.execute("ROLLBACK TO article_batch")
+                self.conn.execute("RELEASE article_batch")
+                self._write_rows_individually(rows)
+        self.conn.commit()
+
+    @staticmethod
+    def _article_row(row):
+        title, categories, url, _ = row
+        return title, ", ".join(categories), url
+
+    def _write_categories(self, rows):
+        ids = category_ids(self.conn, {name for _, categories, _, _ in rows for name in categories})
+        for _, categories, url, _ in rows:
+            article_id = self.conn.execute("SELECT id FROM articles WHERE url = ?", (url,)).fetchone()[0]
+            set_article_categories(self.conn, article_id, categories, ids)
+
+    def _write_links(self, rows):
+        rows = [row for row in rows if row[3] is not None]
+        if not rows:
+            return
+        ids = page_ids(self.conn, {url for _, _, url, _ in rows} | {link for *_, links in rows for link in links})
+        for _, _, url, links in rows:
+            set_page_links(self.conn, ids[url], [ids[link] for link in links])
+
+    def _write_rows_individually(self, rows):
+        for row in rows:
+            try:
+                self.conn.execute(self.upsert_sql, self._article_row(row))
+                self._write_categories([row])
+                self._write_links([row])
+                self.written += 1
+            except sqlite3.IntegrityError as e:
+                self.skipped += 1
+                print(f"Skipped article {row[2]}: {e}")
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,158 @@
+from collections import deque
+from urllib.parse import parse_qs, quote, unquote, urljoin, urlsplit, urlunsplit
+
+base_url = "https://en.wikipedia.org"
+
+# Characters MediaWiki leaves unescaped in /wiki/ paths, e.g. Python_(programming_language)
+_title_safe = "/:@!$&'()*+,;=-._~"
+
+def normalize_url(url, base=base_url):
+    """
+    Return one canonical form of a Wikipedia article url so the same
+    article is only queued once: fragments and query strings are dropped,
+    mobile hosts and index.php?title= links map to /wiki/, and the title
+    is percent-encoded the same way every time
+    """
+    parts = urlsplit(urljoin(base, url))
+    host = parts.netloc.lower().replace(".m.wikipedia.org", ".wikipedia.org")
+    path = parts.path
+    query = parts.query
+
+    if path == "/w/index.php":
+        title = parse_qs(query).get("title")
+        if title:
+            path = "/wiki/" + title[0]
+            query = ""
+
+    if path.startswith("/wiki/"):
+        title = unquote(path[len("/wiki/"):]).replace(" ", "_")
+        # The first letter of a title is case-insensitive on Wikipedia
+        title = title[:1].upper() + title[1:]
+        path = "/wiki/" + quote(title, safe=_title_safe)
+        query = ""
+
+    return urlunsplit(("https", host, path, query, ""))
+
+
+class Frontier:
+    """
+    FIFO crawl frontier with a seen-set: every normalized url is queued at
+    most once, and pop/add are O(1)
+    """
+    def __init__(self):
+        self._queue = deque()
+        self._seen = set()
+
+    def add(self, url):
+        """
+        Queue url unless it has been seen before. Returns True if queued.
+        """
+        url = normalize_url(url)
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._queue.append(url)
+        return True
+
+    def mark_seen(self, url):
+        """
+        Record url (e.g. a redirect target) as seen. Returns False if it
+        already was.
+        """
+        url = normalize_url(url)
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        return True
+
+    def pop(self):
+        """
+        Return the next url to fetch, or None if the frontier is empty
+        """
+        return self._queue.popleft() if self._queue else None
+
+    def mark_done(self, url):
+        pass
+
+    def mark_failed(self, url):
+        pass
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __contains__(self, url):
+        return normalize_url(url) in self._seen
+
+
+class SqliteFrontier(Frontier):
+    """
+    Frontier persisted in a `frontier` table next to `articles`, so a killed
+    crawl resumes where it stopped. Each url has a status of pending,
+    in_flight, done or failed; in_flight rows left by a crash go back to
+    pending on open. Status changes are committed every `commit_every`
+    updates on the shared connection, which also checkpoints any article
+    rows written on it. With commit_every=None the frontier never commits
+    and whoever owns the connection (e.g. an ArticleWriter) does.
+    """
+    def __init__(self, conn, commit_every=20):
+        super().__init__()
+        self.conn = conn
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )
+        """)
+        cur.execute("UPDATE frontier SET status = 'pending' WHERE status = 'in_flight'")
+        conn.commit()
+
+        for url, status in cur.execute("SELECT url, status FROM frontier ORDER BY id"):
+            self._seen.add(url)
+            if status == "pending":
+                self._queue.append(url)
+
+    def _set_status(self, url, status):
+        self.conn.execute("UPDATE frontier SET status = ? WHERE url = ?", (status, url))
+        self._uncommitted += 1
+        if self.commit_every and self._uncommitted >= self.commit_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        self.conn.commit()
+        self._uncommitted = 0
+
+    def add(self, url):
+        if not super().add(url):
+            return False
+        self.conn.execute("INSERT OR IGNORE INTO frontier (url, status) VALUES (?, 'pending')", (self._queue[-1],))
+        return True
+
+    def mark_seen(self, url):
+        if not super().mark_seen(url):
+            return False
+        # Fetched but not yet written: the crawl marks it done after parsing
+        self.conn.execute("INSERT OR IGNORE INTO frontier (url, status) VALUES (?, 'in_flight')", (normalize_url(url),))
+        return True
+
+    def pop(self):
+        url = super().pop()
+        if url is not None:
+            self._set_status(url, "in_flight")
+        return url
+
+    def mark_done(self, url):
+        self._set_status(url, "done")
+
+    def mark_failed(self, url):
+        self._set_status(url, "failed")
+
+    def counts(self):
+        """
+        Return {status: number of urls}
+        """
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status"))
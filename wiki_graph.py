@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Link graph queries over crawled articles
+Loads the links table into array-backed adjacency (CSR: one offsets array
+indexed by page id, one flat targets array) and runs BFS / shortest path on
+it. Memory is 4 bytes per edge plus 4 bytes per page, checked against a
+budget before loading.
+
+    python wiki_graph.py Web_scraping Python_(programming_language)
+    python wiki_graph.py --top 20
+"""
+
+import sqlite3
+import sys
+from array import array
+from collections import deque
+from wiki_frontier import normalize_url
+
+
+class LinkGraph:
+    """
+    Outbound adjacency of the crawl graph: the neighbours of page id `n`
+    are targets[offsets[n]:offsets[n + 1]]
+    """
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def load(cls, conn, max_bytes=256 * 1024 * 1024):
+        """
+        Build the graph from the links table, streaming edges in source
+        order. Raises MemoryError if the arrays would exceed max_bytes.
+        """
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM pages").fetchone()[0]
+        edge_count = conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+        needed = 4 * (max_id + 2) + 4 * edge_count
+        if needed > max_bytes:
+            raise MemoryError(f"Link graph needs {needed} bytes, budget is {max_bytes}")
+
+        offsets = array("I", bytes(4 * (max_id + 2)))
+        targets = array("I")
+        current = 0
+        for source_id, target_id in conn.execute("SELECT source_id, target_id FROM links ORDER BY source_id"):
+            while current < source_id:
+                current += 1
+                offsets[current] = len(targets)
+            targets.append(target_id)
+        while current <= max_id:
+            current += 1
+            offsets[current] = len(targets)
+        return cls(offsets, targets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def neighbours(self, node):
+        if node >= len(self):
+            return self.targets[0:0]
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def bfs(self, start, max_depth=None):
+        """
+        Yield (page id, depth) in breadth-first order from start
+        """
+        visited = bytearray(len(self) + 1)
+        visited[start] = 1
+        queue = deque([(start, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            yield node, depth
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for target in self.neighbours(node):
+                if not visited[target]:
+                    visited[target] = 1
+                    queue.append((target, depth + 1))
+
+    def shortest_path(self, source, target):
+        """
+        Return the page ids of a shortest link path from source to target
+        (the "Wikipedia game"), or None if target can't be reached
+        """
+        if source == target:
+            return [source]
+        parent = array("i", [-1]) * (len(self) + 1)
+        parent[source] = source
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for nxt in self.neighbours(node):
+                if parent[nxt] == -1:
+                    parent[nxt] = node
+                    if nxt == target:
+                        path = [target]
+                        while path[-1] != source:
+                            path.append(parent[path[-1]])
+                        return path[::-1]
+                    queue.append(nxt)
+        return None
+
+
+def page_id(conn, url):
+    """
+    Return the page id of url (or a bare article title), or None
+    """
+    if "/" not in url:
+        url = "/wiki/" + url
+    row = conn.execute("SELECT id FROM pages WHERE url = ?", (normalize_url(url),)).fetchone()
+    return row[0] if row else None
+
+
+def page_urls(conn, ids):
+    """
+    Return the urls of the given page ids, in order
+    """
+    return [conn.execute("SELECT url FROM pages WHERE id = ?", (page,)).fetchone()[0] for page in ids]
+
+
+def in_degree_ranking(conn, limit=20):
+    """
+    Return (url, in-degree) for the most linked-to pages, counted on the
+    links target index without loading the graph
+    """
+    return conn.execute("""
+        SELECT p.url, t.n FROM (
+            SELECT target_id, COUNT(*) AS n FROM links
+            GROUP BY target_id ORDER BY n DESC LIMIT ?
+        ) t JOIN pages p ON p.id = t.target_id
+        ORDER BY t.n DESC
+    """, (limit,)).fetchall()
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect("wikipedia_articles.db")
+    if len(sys.argv) == 3 and sys.argv[1] == "--top":
+        for url, n in in_degree_ranking(conn, int(sys.argv[2])):
+            print(f"{n:>6}  {url}")
+    elif len(sys.argv) == 3:
+        source, target = page_id(conn, sys.argv[1]), page_id(conn, sys.argv[2])
+        if source is None or target is None:
+            print("Both pages must have been seen by the crawler")
+        else:
+            graph = LinkGraph.load(conn)
+            path = graph.shortest_path(source, target)
+            if path is None:
+                print("No path found in the crawled graph")
+            else:
+                for url in page_urls(conn, path):
+                    print(url)
+    else:
+        print(__doc__)
+    conn.close()